@@ -1,5 +1,22 @@
+import importlib
+
 import streamlit as st
-from modules import auth, food_optimizer, healthcare_chatbot, waste_to_resource, cultural_integration, hygiene_auditor, store_locator
+from modules import auth, tracing
+
+# Sidebar entry -> module providing app(). Modules are imported only when first selected,
+# so heavy dependencies (PuLP, pydeck, Gemini, gTTS, ...) load only for the pages in use.
+MODULES = {
+    "Multilingual Healthcare Chatbot": "modules.healthcare_chatbot",
+    "Waste-to-Resource AI Platform": "modules.waste_to_resource",
+    "AI-Powered Cultural Integration Hub": "modules.cultural_integration",
+    "AI-Driven Food Distribution Optimizer": "modules.food_optimizer",
+    "Hygiene Compliance Auditor": "modules.hygiene_auditor",
+    "Store Locator": "modules.store_locator",
+    "Multilingual Broadcast": "modules.broadcast",
+}
+
+def load_module(module_choice):
+    return importlib.import_module(MODULES[module_choice])
 
 def main():
     auth.init_db()
@@ -9,30 +26,24 @@ def main():
         return
 
     st.sidebar.title("Refugee Campaign AI Platform")
-    module_choice = st.sidebar.selectbox(
-        "Choose a Module",
-        [
-            "Multilingual Healthcare Chatbot",
-            "Waste-to-Resource AI Platform",
-            "AI-Powered Cultural Integration Hub",
-            "AI-Driven Food Distribution Optimizer",
-            "Hygiene Compliance Auditor",
-            "Store Locator"
-        ]
-    )
+    module_choice = st.sidebar.selectbox("Choose a Module", list(MODULES))
     
     st.sidebar.write(f"Logged in as: {st.session_state.get('username', 'Unknown')}")
     
-    module_mapping = {
-        "Multilingual Healthcare Chatbot": healthcare_chatbot.app,
-        "Waste-to-Resource AI Platform": waste_to_resource.app,
-        "AI-Driven Food Distribution Optimizer": food_optimizer.app,
-        "AI-Powered Cultural Integration Hub": cultural_integration.app,
-        "Hygiene Compliance Auditor": hygiene_auditor.app,
-        "Store Locator": store_locator.app
-    }
-    
-    module_mapping.get(module_choice, lambda: None)()
+    page = load_module(module_choice)
+    is_admin = st.session_state.get("role") == "admin"
+    try:
+        # Requested from the admin panel on an earlier rerun.
+        if is_admin and st.session_state.pop("profile_next_rerun", False):
+            report = tracing.profile_call(page.app)
+            st.session_state["profile_report"] = report or "Another profile was being captured; try again."
+        else:
+            page.app()
+        if is_admin:
+            tracing.admin_panel()
+    finally:
+        # Also after a failing page, whose errors are what the error counters record.
+        tracing.export_if_due()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,89 @@
+"""
+Concurrent login load test for the auth store.
+
+Provisions users in a scratch SQLite database with `import_users`, then fires logins
+(and a share of new registrations, which take SQLite's write lock) from many threads,
+the way one Streamlit server process serves many sessions:
+
+    python benchmarks/auth_load.py --users 2000 --concurrency 200 --logins 5000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else (values[0] if values else 0.0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent logins against a local auth database.")
+    parser.add_argument("--users", type=int, default=2000, help="Users provisioned before the test.")
+    parser.add_argument("--concurrency", type=int, default=200, help="Simultaneous sessions (threads).")
+    parser.add_argument("--logins", type=int, default=5000, help="Total requests.")
+    parser.add_argument("--register-ratio", type=float, default=0.05, help="Share of requests that register a new user.")
+    parser.add_argument("--db", help="SQLite file to use (default: a new temporary file).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON.")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix="auth_load_"), "auth.db")
+    # The engine is created when modules.auth is imported, so point it at the scratch database first.
+    os.environ["AUTH_DATABASE_URL"] = f"sqlite:///{path}"
+    from modules import auth
+
+    rng = random.Random(args.seed)
+    provisioned = auth.import_users({"username": f"worker{i}", "password": f"pw{i}"} for i in range(args.users))
+    plan = []
+    for i in range(args.logins):
+        if rng.random() < args.register_ratio:
+            plan.append(("register", f"new{args.seed}_{i}", "pw"))
+        else:
+            user = rng.randrange(args.users)
+            plan.append(("login", f"worker{user}", f"pw{user}"))
+
+    def request(item):
+        kind, username, password = item
+        start = time.perf_counter()
+        try:
+            if kind == "login":
+                ok, _ = auth.authenticate_user(username, password)
+            else:
+                ok, _ = auth.register_user(username, password)
+            error = None if ok else "rejected"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}".splitlines()[0]
+        return kind, time.perf_counter() - start, error
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(request, plan))
+    elapsed = time.perf_counter() - start
+
+    errors = [error for _, _, error in results if error]
+    report = {"database": path, "provisioned": provisioned["inserted"], "requests": len(results),
+              "concurrency": args.concurrency, "seconds": elapsed, "requests_per_s": len(results) / elapsed,
+              "errors": len(errors), "database_locked": sum("database is locked" in e for e in errors)}
+    for kind in ("login", "register"):
+        latencies = sorted(latency for k, latency, _ in results if k == kind)
+        if latencies:
+            report[f"{kind}_p50_ms"] = 1000 * percentile(latencies, 50)
+            report[f"{kind}_p95_ms"] = 1000 * percentile(latencies, 95)
+            report[f"{kind}_p99_ms"] = 1000 * percentile(latencies, 99)
+    if args.json:
+        print(json.dumps(report))
+    else:
+        for key, value in report.items():
+            print(f"{key:<18} {value:.2f}" if isinstance(value, float) else f"{key:<18} {value}")
+        if errors:
+            print("first error:", errors[0])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Offline stand-ins for Gemini, googletrans, gTTS and Nominatim with a simulated
+round-trip latency, so the network-bound pages can be timed without a network.
+
+`OfflineServices` points the process-wide services of every module at the fakes;
+`reset()` gives each service empty caches, so every run starts cold.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from modules.geocoding import Geocoder, StaticProvider, set_geocoder
+from modules.llm_cache import FakeModel, ResponseCache, set_backend_factory, set_response_cache
+from modules.translation import StaticBackend, TranslationService, set_translator
+from modules.tts_cache import AudioCache, set_audio_cache
+
+# Seconds per simulated request; real calls take 0.1-2 s, but only the overhead around them matters here.
+DEFAULT_LATENCY = 0.01
+# About what gTTS produces: 32 kbit/s MP3 at roughly 15 characters of speech per second.
+MP3_BYTES_PER_CHAR = 270
+
+class SlowTranslator(StaticBackend):
+    """googletrans stand-in: StaticBackend plus a fixed delay per request."""
+
+    def __init__(self, latency=DEFAULT_LATENCY, translations=None):
+        super().__init__(translations)
+        self.latency = latency
+
+    def translate(self, text, dest, src="auto"):
+        time.sleep(self.latency)
+        return super().translate(text, dest, src)
+
+class SlowProvider(StaticProvider):
+    """Nominatim stand-in: StaticProvider plus a fixed delay per request."""
+
+    def __init__(self, places=None, latency=DEFAULT_LATENCY):
+        super().__init__(places)
+        self.latency = latency
+
+    def geocode(self, query):
+        time.sleep(self.latency)
+        return super().geocode(query)
+
+class FakeSpeech:
+    """gTTS stand-in for AudioCache: writes deterministic MP3-sized bytes after a fixed delay; counts calls."""
+
+    def __init__(self, latency=DEFAULT_LATENCY, bytes_per_char=MP3_BYTES_PER_CHAR):
+        self.latency = latency
+        self.bytes_per_char = bytes_per_char
+        self.calls = 0
+
+    def __call__(self, text, lang, f):
+        self.calls += 1
+        time.sleep(self.latency)
+        block = hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).digest()
+        size = max(1, len(text)) * self.bytes_per_char
+        f.write((block * (size // len(block) + 1))[:size])
+
+class OfflineServices:
+    """
+    Install the fakes as the backends of the process-wide LLM, translation, audio and
+    geocoding services. Scratch files go under `workdir` (a new temporary directory
+    by default, removed by `close()`). Replace `provider` and call `reset()` to
+    geocode against other places.
+    """
+
+    def __init__(self, latency=DEFAULT_LATENCY, places=None, workdir=None):
+        self.workdir = workdir or tempfile.mkdtemp(prefix="benchmarks_")
+        self._own_workdir = workdir is None
+        self.latency = latency
+        self.gemini = FakeModel(latency=latency, chunk_delay=latency / 10)
+        self.translator = SlowTranslator(latency)
+        self.speech = FakeSpeech(latency)
+        self.provider = SlowProvider(places, latency)
+        self.translation = TranslationService(self.translator)
+        set_backend_factory(lambda model_name, generation_config: self.gemini)
+        set_translator(self.translation)
+        self.reset()
+
+    def reset(self):
+        """Empty every cache (response, translation memory, audio files, geocodes)."""
+        set_response_cache(ResponseCache(path=None))
+        self.translation.clear()
+        audio_dir = os.path.join(self.workdir, "tts_cache")
+        shutil.rmtree(audio_dir, ignore_errors=True)
+        set_audio_cache(AudioCache(audio_dir, synthesize=self.speech))
+        set_geocoder(Geocoder(provider=self.provider, cache_path=None))
+
+    def close(self):
+        if self._own_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
@@ -0,0 +1,136 @@
+"""
+Seeded input generators for the benchmark suite. The same (size, seed) always gives
+the same data, so two runs of the suite measure identical work.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+# Waste labels of the synthetic images and the base color and texture that tells them apart.
+IMAGE_CLASSES = {
+    "organic": ((96, 72, 40), "noise"),
+    "metal": ((150, 150, 160), "stripes"),
+    "plastic": ((40, 140, 210), "flat"),
+}
+
+def transport_instance(num_supply, num_demand, seed=0, imbalance=0.1):
+    """
+    A random transportation problem: centers and locations scattered on a 100 x 100
+    grid with distance-based costs, and total demand `imbalance` above total supply
+    (so a dummy supply row is added).
+
+    Returns:
+        supply (list), demand (list), cost_matrix (list of lists)
+    """
+    rng = np.random.default_rng(seed)
+    centers, locations = rng.uniform(0, 100, (num_supply, 2)), rng.uniform(0, 100, (num_demand, 2))
+    cost = np.linalg.norm(centers[:, None, :] - locations[None, :, :], axis=2) * rng.uniform(0.8, 1.2, (num_supply, num_demand))
+    demand = rng.integers(10, 100, num_demand)
+    supply = rng.dirichlet(np.ones(num_supply)) * demand.sum() / (1 + imbalance)
+    return np.round(supply).tolist(), demand.tolist(), np.round(cost, 2).tolist()
+
+def store_catalog(n, seed=0, duplicate_share=0.0):
+    """
+    `n` stores as {"name", "lat", "lon"} dicts, clustered around a few hundred towns.
+    About `duplicate_share` of them reuse the coordinates of another store (several
+    shops in one mall, or a catalog geocoded to town centres).
+    """
+    rng = np.random.default_rng(seed)
+    towns = np.column_stack([rng.uniform(-60, 70, 300), rng.uniform(-180, 180, 300)])
+    home = towns[rng.integers(0, len(towns), n)]
+    lats = np.clip(home[:, 0] + rng.normal(0, 0.5, n), -89.9, 89.9)
+    lons = (home[:, 1] + rng.normal(0, 0.5, n) + 180) % 360 - 180
+    copies = np.flatnonzero(rng.random(n) < duplicate_share)
+    originals = rng.integers(0, n, len(copies))
+    lats[copies], lons[copies] = lats[originals], lons[originals]
+    return [{"name": f"Store {i}", "lat": float(lat), "lon": float(lon)} for i, (lat, lon) in enumerate(zip(lats, lons))]
+
+def query_points(n, seed=0):
+    """`n` random (lat, lon) user locations."""
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(-60, 70, n), rng.uniform(-180, 180, n)])
+
+def camp_registry(n, seed=0):
+    """A camp registry DataFrame with `camp`, `city` and the METRIC_COLUMNS, as read by `assess_camps`."""
+    rng = np.random.default_rng(seed)
+    refugees = rng.integers(0, 20000, n)
+    columns = {
+        "camp": [f"Camp {i}" for i in range(n)],
+        "city": [f"Town {i % 500}" for i in range(n)],
+        "refugees": refugees,
+        "water": rng.uniform(0, 100, n).round(1),
+        "electricity": rng.uniform(0, 100, n).round(1),
+        "food": rng.uniform(0, 100, n).round(1),
+        "stay": rng.uniform(0, 100, n).round(1),
+        "workers": (refugees * rng.uniform(0, 0.04, n)).astype(int),
+        "equipment": (refugees * rng.uniform(0, 0.1, n)).astype(int),
+        "washrooms": (refugees * rng.uniform(0, 0.03, n)).astype(int),
+        "bathrooms": (refugees * rng.uniform(0, 0.03, n)).astype(int),
+        "kits": rng.integers(0, 3, n),
+    }
+    return pd.DataFrame(columns)
+
+def synthetic_image(label, rng, size=256):
+    """One RGB array of shape (size, size, 3) in the style of `label` (see IMAGE_CLASSES)."""
+    color, texture = IMAGE_CLASSES[label]
+    image = np.empty((size, size, 3), dtype=float)
+    image[:] = np.asarray(color) + rng.normal(0, 12, 3)
+    if texture == "noise":
+        image += rng.normal(0, 30, (size, size, 1))
+    elif texture == "stripes":
+        period = rng.integers(6, 16)
+        image += 40 * np.sin(np.arange(size) * 2 * np.pi / period)[None, :, None]
+    image += rng.normal(0, 4, image.shape)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+def synthetic_images(n, size=256, seed=0, quality=85):
+    """
+    `n` labelled JPEG images, cycling through IMAGE_CLASSES.
+
+    Returns:
+        list of (name, jpeg bytes, label)
+    """
+    rng = np.random.default_rng(seed)
+    labels = list(IMAGE_CLASSES)
+    images = []
+    for i in range(n):
+        label = labels[i % len(labels)]
+        buffer = io.BytesIO()
+        Image.fromarray(synthetic_image(label, rng, size)).save(buffer, format="JPEG", quality=quality)
+        images.append((f"{label}/{i:05d}.jpg", buffer.getvalue(), label))
+    return images
+
+def place_names(n, seed=0, known_share=0.8):
+    """
+    `n` place names with repeats and case variants, as found in a camp registry.
+    Roughly `known_share` of the distinct names can be resolved.
+
+    Returns:
+        names (list of str), places {name: (lat, lon)} for the resolvable names
+    """
+    rng = np.random.default_rng(seed)
+    distinct = max(1, n // 2)
+    places = [f"Town {i}" for i in range(distinct)]
+    coords = query_points(distinct, seed)
+    known = {place: (float(lat), float(lon)) for place, (lat, lon) in zip(places, coords) if rng.random() < known_share}
+    names = [places[i] for i in rng.integers(0, distinct, n)]
+    names = [name.upper() if rng.random() < 0.1 else name for name in names]
+    return names, known
+
+def advisory_text(sentences, seed=0):
+    """English prose of `sentences` sentences (a few hundred characters per five sentences)."""
+    rng = np.random.default_rng(seed)
+    words = ("water food shelter clinic rest fever children medicine distribution camp registration "
+             "doctor symptoms hygiene safe drink wash hands visit daily support").split()
+    return " ".join(
+        " ".join(words[i] for i in rng.integers(0, len(words), rng.integers(6, 16))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+def user_rows(n, prefix="user", seed=0):
+    """`n` rows for `auth.import_users` (`username`, `password`, `role`)."""
+    rng = np.random.default_rng(seed)
+    roles = np.where(rng.random(n) < 0.05, "admin", "user")
+    return [{"username": f"{prefix}{i}", "password": f"pw-{prefix}-{i}", "role": str(role)} for i, role in enumerate(roles)]
@@ -0,0 +1,71 @@
+"""
+Cold-start benchmark for app.py.
+
+Every scenario imports a set of modules in a fresh interpreter and reports the import
+time and the resident memory before and after. "lazy" is what app.py loads before a
+page is picked, "eager" is every page up front (how app.py used to start), and each
+"page:" scenario is app.py plus one page.
+
+    python benchmarks/startup.py [--repeat 3] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CHILD = """
+import importlib, json, resource, sys, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+before = rss_mb()
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+print(json.dumps({"import_s": time.perf_counter() - start, "rss_before_mb": before, "rss_after_mb": rss_mb()}))
+"""
+
+def scenarios():
+    from app import MODULES
+    yield "lazy", ["app"]
+    yield "eager", ["app", *MODULES.values()]
+    for name, module in MODULES.items():
+        yield f"page: {name}", ["app", module]
+
+def measure(modules, repeat):
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", CHILD, *modules], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold import time and RSS of app.py and its pages.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (the median is reported).")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per scenario.")
+    args = parser.parse_args(argv)
+    for name, modules in scenarios():
+        result = {"scenario": name, **measure(modules, args.repeat)}
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f"{name:<45} import {result['import_s']:6.2f} s   RSS {result['rss_before_mb']:6.1f} -> "
+                  f"{result['rss_after_mb']:6.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+"""
+Benchmark suite for the hot paths of every page.
+
+Each case times one function on seeded inputs of several sizes; the network-bound
+pages run against the offline fakes in benchmarks/fakes.py. Results (median and
+minimum wall time, and peak Python-heap memory from a separate tracemalloc run) are
+printed and can be written as JSON; `compare` flags regressions between two runs.
+
+    python benchmarks/suite.py run [--quick] [--only food stores] [--out results.json]
+    python benchmarks/suite.py compare base.json new.json [--threshold 0.25]
+    python benchmarks/suite.py list
+"""
+import argparse
+import datetime
+import functools
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import generators
+from benchmarks.fakes import DEFAULT_LATENCY, OfflineServices, SlowProvider
+
+# Case name -> {"setup", "sizes", "quick"}. setup(size, services, seed) prepares the inputs
+# and returns the zero-argument callable that is timed.
+CASES = {}
+# Differences below these are noise, whatever the ratio.
+MIN_SECONDS_DELTA = 0.002
+MIN_MB_DELTA = 1.0
+
+def case(name, sizes, quick):
+    def register(setup):
+        CASES[name] = {"setup": setup, "sizes": sizes, "quick": quick}
+        return setup
+    return register
+
+# --- Food distribution ---
+
+@case("food.optimize.highs", sizes=[10, 40, 100], quick=[10, 40])
+def _optimize_highs(size, services, seed):
+    from modules.food_optimizer import optimize_food_distribution
+    supply, demand, cost = generators.transport_instance(size, 3 * size, seed)
+    return lambda: optimize_food_distribution(supply, demand, cost, solver="highs")
+
+@case("food.optimize.pulp", sizes=[10, 40], quick=[10])
+def _optimize_pulp(size, services, seed):
+    from modules.food_optimizer import optimize_food_distribution
+    supply, demand, cost = generators.transport_instance(size, 3 * size, seed)
+    return lambda: optimize_food_distribution(supply, demand, cost, solver="pulp")
+
+@case("food.preview", sizes=[10, 40, 100], quick=[10, 40])
+def _preview(size, services, seed):
+    from modules.food_optimizer import preview_food_distribution
+    supply, demand, cost = generators.transport_instance(size, 3 * size, seed)
+    return lambda: preview_food_distribution(supply, demand, cost)
+
+# --- Store locator ---
+
+@case("stores.haversine_distance", sizes=[10_000, 100_000], quick=[10_000])
+def _haversine(size, services, seed):
+    from modules.store_locator import haversine_distance
+    points = generators.query_points(2 * size, seed).tolist()
+    pairs = list(zip(points[:size], points[size:]))
+    return lambda: [haversine_distance(a[0], a[1], b[0], b[1]) for a, b in pairs]
+
+@case("stores.find_nearest_store", sizes=[1_000, 10_000, 100_000], quick=[1_000, 10_000])
+def _find_nearest(size, services, seed):
+    from modules.store_locator import find_nearest_store
+    stores = generators.store_catalog(size, seed)
+    users = generators.query_points(20, seed + 1).tolist()
+    return lambda: [find_nearest_store(user, stores) for user in users]
+
+def check_nearest(index, users, k, samples=50):
+    """Fail unless `k_nearest_batch` matches a linear haversine scan (ties to the lower store position)."""
+    import numpy as np
+    from modules.store_index import haversine_distances
+    indices, _ = index.k_nearest_batch(users[:samples], k=k)
+    for (lat, lon), found in zip(users[:samples], indices):
+        distances = haversine_distances(lat, lon, index.lats, index.lons)
+        expected = np.lexsort((np.arange(len(distances)), distances))[:k]
+        if not np.array_equal(found, expected):
+            raise AssertionError(f"k_nearest_batch({lat:.4f}, {lon:.4f}) gave {found}, linear scan {expected}")
+
+@case("stores.k_nearest_batch", sizes=[10_000, 100_000, 300_000], quick=[10_000, 100_000])
+def _k_nearest(size, services, seed):
+    from modules.store_index import StoreIndex
+    index = StoreIndex.from_records(generators.store_catalog(size, seed))
+    users = generators.query_points(1000, seed + 1)
+    check_nearest(index, users, k=5)
+    return lambda: index.k_nearest_batch(users, k=5)
+
+@case("stores.k_nearest_batch.duplicates", sizes=[10_000, 100_000], quick=[10_000])
+def _k_nearest_duplicates(size, services, seed):
+    import numpy as np
+    from modules.store_index import StoreIndex
+    index = StoreIndex.from_records(generators.store_catalog(size, seed, duplicate_share=0.5))
+    # Half of the queries sit exactly on a store, where equal distances are most common.
+    users = np.concatenate([np.column_stack([index.lats[:500], index.lons[:500]]),
+                            generators.query_points(500, seed + 1)])
+    check_nearest(index, users, k=1, samples=len(users))
+    check_nearest(index, users, k=5)
+    return lambda: index.k_nearest_batch(users, k=5)
+
+# --- Hygiene auditor ---
+
+@case("hygiene.compute_sanitation_score", sizes=[1_000, 10_000], quick=[1_000])
+def _sanitation_score(size, services, seed):
+    from modules.hygiene_auditor import compute_sanitation_score
+    rows = generators.camp_registry(size, seed)[
+        ["refugees", "workers", "equipment", "washrooms", "bathrooms", "kits"]].to_numpy().tolist()
+    return lambda: [compute_sanitation_score(*row) for row in rows]
+
+@case("hygiene.assess_camps", sizes=[1_000, 10_000, 100_000], quick=[1_000, 10_000])
+def _assess_camps(size, services, seed):
+    from modules.hygiene_auditor import assess_camps
+    camps = generators.camp_registry(size, seed)
+    return lambda: assess_camps(camps)
+
+@case("hygiene.geocode_city", sizes=[100, 1_000], quick=[100])
+def _geocode_city(size, services, seed):
+    from modules.geocoding import geocode_city
+    names, places = generators.place_names(size, seed)
+    services.provider = SlowProvider(places, services.latency)
+    services.reset()
+    return lambda: [geocode_city(name) for name in names]
+
+@case("hygiene.geocode_names", sizes=[100, 1_000], quick=[100])
+def _geocode_names(size, services, seed):
+    from modules.bulk_geocoding import geocode_names
+    names, places = generators.place_names(size, seed)
+    services.provider = SlowProvider(places, services.latency)
+    services.reset()
+    return lambda: list(geocode_names(names, rate_limit=None))
+
+# --- Waste classification ---
+
+@functools.lru_cache(maxsize=None)
+def _waste_model(seed):
+    """Fit a classifier on synthetic images and install it at WASTE_MODEL_PATH (set by `run`)."""
+    from modules.waste_classifier import MODEL_PATH, extract_features, fit, load_rgb
+    import numpy as np
+    images = generators.synthetic_images(90, seed=seed)
+    features = extract_features(np.stack([load_rgb(data) for _, data, _ in images]))
+    model = fit(features, np.array([label for _, _, label in images]))
+    model.save(MODEL_PATH)
+    return model
+
+@case("waste.classify_waste", sizes=[10, 50], quick=[10])
+def _classify_waste(size, services, seed):
+    import io
+    from PIL import Image
+    from modules.waste_to_resource import classify_waste
+    _waste_model(seed)
+    images = [Image.open(io.BytesIO(data)).copy() for _, data, _ in generators.synthetic_images(size, seed=seed + 1)]
+    return lambda: [classify_waste(image) for image in images]
+
+@case("waste.classify_batch", sizes=[64, 256], quick=[64])
+def _classify_batch(size, services, seed):
+    from modules.classification_cache import ClassificationCache
+    from modules.waste_to_resource import classify_batch
+    model = _waste_model(seed)
+    items = [(name, data) for name, data, _ in generators.synthetic_images(size, seed=seed + 1)]
+    cache = ClassificationCache(path=None, version=model.version)
+    return lambda: list(classify_batch(items, max_workers=2, cache=cache, model=model))
+
+# --- Authentication (a scratch SQLite database, see `run`) ---
+
+PROVISIONED_USERS = 5_000
+
+@functools.lru_cache(maxsize=None)
+def _provisioned(seed):
+    from modules import auth
+    rows = generators.user_rows(PROVISIONED_USERS, prefix="worker", seed=seed)
+    auth.import_users(rows)
+    return rows
+
+@case("auth.authenticate_user", sizes=[100, 1_000], quick=[100])
+def _authenticate(size, services, seed):
+    import random
+    from modules.auth import authenticate_user
+    rows = _provisioned(seed)
+    rng = random.Random(seed)
+    # One login in ten uses a wrong password.
+    logins = [(row["username"], row["password"] if rng.random() < 0.9 else "wrong")
+              for row in rng.choices(rows, k=size)]
+    return lambda: [authenticate_user(username, password) for username, password in logins]
+
+_import_batches = iter(range(sys.maxsize))
+
+@case("auth.import_users", sizes=[1_000, 10_000, 50_000], quick=[1_000, 10_000])
+def _import_users(size, services, seed):
+    from modules.auth import import_users
+    _provisioned(seed)
+    # New usernames for every run, so each run inserts into a table of similar size.
+    rows = generators.user_rows(size, prefix=f"import{next(_import_batches)}_", seed=seed)
+    return lambda: import_users(rows)
+
+# --- LLM, translation and speech (offline fakes) ---
+
+def _symptoms(size, seed):
+    # Half of the questions are repeats, as on a busy day at a clinic.
+    distinct = [generators.advisory_text(1, seed + i) for i in range(max(1, size // 2))]
+    return [distinct[i % len(distinct)] for i in range(size)]
+
+@case("llm.get_medical_advice_ai", sizes=[10, 50], quick=[10])
+def _medical_advice(size, services, seed):
+    from modules.healthcare_chatbot import get_medical_advice_ai
+    questions = _symptoms(size, seed)
+    services.reset()
+    return lambda: [get_medical_advice_ai(question) for question in questions]
+
+@case("llm.stream_medical_advice", sizes=[10, 50], quick=[10])
+def _stream_advice(size, services, seed):
+    from modules.healthcare_chatbot import stream_medical_advice
+    questions = _symptoms(size, seed)
+    services.reset()
+    return lambda: ["".join(stream_medical_advice(question)) for question in questions]
+
+@case("llm.get_cultural_insights", sizes=[10, 50], quick=[10])
+def _cultural_insights(size, services, seed):
+    from modules.cultural_integration import get_cultural_insights
+    countries = [f"Country {i % max(1, size // 2)}" for i in range(size)]
+    services.reset()
+    return lambda: [get_cultural_insights(country) for country in countries]
+
+@case("translation.translate_text", sizes=[20, 200, 1_000], quick=[20, 200])
+def _translate(size, services, seed):
+    from modules.cultural_integration import translate_text
+    text = generators.advisory_text(size, seed)
+    services.reset()
+    return lambda: translate_text(text, "es")
+
+@case("tts.iter_speech", sizes=[5, 20, 80], quick=[5, 20])
+def _speech(size, services, seed):
+    from modules.cultural_integration import iter_speech
+    text = generators.advisory_text(size, seed)
+    services.reset()
+    return lambda: list(iter_speech(text, "en"))
+
+@case("broadcast.broadcast", sizes=[5, 20], quick=[5])
+def _broadcast(size, services, seed):
+    from modules.broadcast import broadcast
+    text = generators.advisory_text(size, seed)
+    services.reset()
+    return lambda: broadcast(text)
+
+# --- Runner ---
+
+def measure(setup, size, services, seed, repeat=3, memory=True):
+    """
+    Time `repeat` runs of one case (each on freshly set up inputs), then trace one
+    more run's peak Python-heap allocation.
+
+    Returns:
+        dict: `seconds` (median), `min_seconds` and, with `memory`, `peak_mb`. Memory
+        allocated in worker processes is not included.
+    """
+    times = []
+    for _ in range(repeat):
+        run = setup(size, services, seed)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    result = {"seconds": statistics.median(times), "min_seconds": min(times)}
+    if memory:
+        run = setup(size, services, seed)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return result
+
+def selected(only):
+    return [name for name in CASES if not only or any(name.startswith(prefix) for prefix in only)]
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    names = selected(args.only)
+    if not names:
+        sys.exit(f"No benchmark matches {args.only}; see `python benchmarks/suite.py list`.")
+    services = OfflineServices(latency=args.latency)
+    # Read when modules.auth / modules.waste_classifier are first imported, i.e. by the first case using them.
+    os.environ["AUTH_DATABASE_URL"] = f"sqlite:///{os.path.join(services.workdir, 'auth.db')}"
+    os.environ["WASTE_MODEL_PATH"] = os.path.join(services.workdir, "waste_classifier.npz")
+    report = {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "quick": args.quick, "repeat": args.repeat, "latency": args.latency,
+            "seed": args.seed,
+        },
+        "results": [],
+    }
+    try:
+        for name in names:
+            for size in CASES[name]["quick" if args.quick else "sizes"]:
+                result = {"case": name, "size": size,
+                          **measure(CASES[name]["setup"], size, services, args.seed, args.repeat, not args.no_memory)}
+                report["results"].append(result)
+                memory = f"   peak {result['peak_mb']:8.1f} MB" if "peak_mb" in result else ""
+                print(f"{name:<34} {size:>9}   {result['seconds'] * 1000:10.1f} ms{memory}", flush=True)
+    finally:
+        services.close()
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+def compare(base, new, threshold=0.25):
+    """
+    Match the results of two runs by case and size.
+
+    Times are compared on `min_seconds`, the figure least disturbed by other load on
+    the machine. A time (or peak memory) more than `threshold` above the base run,
+    and by more than MIN_SECONDS_DELTA (or MIN_MB_DELTA), is a regression; the same
+    margin below is an improvement.
+
+    Returns:
+        list of dict: `case`, `size`, the base and new figures, `time_ratio`,
+        `memory_ratio` and `status` ("regression", "improved", "ok", "new" or "removed").
+    """
+    base_results = {(r["case"], r["size"]): r for r in base["results"]}
+    new_results = {(r["case"], r["size"]): r for r in new["results"]}
+    rows = []
+    for key in list(base_results) + [key for key in new_results if key not in base_results]:
+        old, cur = base_results.get(key), new_results.get(key)
+        row = {"case": key[0], "size": key[1], "base_seconds": old and old["min_seconds"],
+               "new_seconds": cur and cur["min_seconds"], "base_peak_mb": old and old.get("peak_mb"),
+               "new_peak_mb": cur and cur.get("peak_mb"), "time_ratio": None, "memory_ratio": None}
+        if old is None or cur is None:
+            row["status"] = "new" if old is None else "removed"
+            rows.append(row)
+            continue
+        changes = [_change(row["base_seconds"], row["new_seconds"], threshold, MIN_SECONDS_DELTA)]
+        row["time_ratio"] = row["new_seconds"] / row["base_seconds"] if row["base_seconds"] else None
+        if row["base_peak_mb"] is not None and row["new_peak_mb"] is not None:
+            changes.append(_change(row["base_peak_mb"], row["new_peak_mb"], threshold, MIN_MB_DELTA))
+            row["memory_ratio"] = row["new_peak_mb"] / row["base_peak_mb"] if row["base_peak_mb"] else None
+        row["status"] = "regression" if "regression" in changes else "improved" if "improved" in changes else "ok"
+        rows.append(row)
+    return rows
+
+def _change(old, new, threshold, min_delta):
+    if abs(new - old) < min_delta:
+        return "ok"
+    if new > old * (1 + threshold):
+        return "regression"
+    if new < old / (1 + threshold):
+        return "improved"
+    return "ok"
+
+def _ratio(value):
+    return f"{value:6.2f}x" if value is not None else "      -"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the hot paths of every page on seeded inputs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_cmd = commands.add_parser("run", help="Run the benchmarks.")
+    run_cmd.add_argument("--quick", action="store_true", help="Only the smaller sizes of each case.")
+    run_cmd.add_argument("--only", nargs="+", metavar="PREFIX", help="Cases whose name starts with one of these.")
+    run_cmd.add_argument("--repeat", type=int, default=3, help="Timed runs per size (the median is reported).")
+    run_cmd.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                         help="Simulated seconds per Gemini / googletrans / gTTS / Nominatim request.")
+    run_cmd.add_argument("--seed", type=int, default=0)
+    run_cmd.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run.")
+    run_cmd.add_argument("--out", help="Write the results to this JSON file.")
+    compare_cmd = commands.add_parser("compare", help="Compare two result files; exits with 1 on a regression.")
+    compare_cmd.add_argument("base")
+    compare_cmd.add_argument("new")
+    compare_cmd.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown that counts (0.25 = 25%%).")
+    compare_cmd.add_argument("--json", action="store_true", help="Print the comparison as JSON.")
+    commands.add_parser("list", help="List the cases and their sizes.")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name, spec in CASES.items():
+            print(f"{name:<34} sizes {spec['sizes']}   quick {spec['quick']}")
+    elif args.command == "run":
+        run(args)
+    else:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        rows = compare(base, new, args.threshold)
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            for row in rows:
+                print(f"{row['case']:<34} {row['size']:>9}   time {_ratio(row['time_ratio'])}   "
+                      f"memory {_ratio(row['memory_ratio'])}   {row['status']}")
+        regressions = sum(row["status"] == "regression" for row in rows)
+        print(f"{regressions} regression(s) at a {args.threshold:.0%} threshold", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
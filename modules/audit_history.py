@@ -0,0 +1,194 @@
+# modules/audit_history.py
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer, String, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from modules.auth import Base, engine
+
+# Append-only log of every hygiene assessment.
+class HygieneAssessment(Base):
+    __tablename__ = "hygiene_assessments"
+    id = Column(Integer, primary_key=True)
+    camp = Column(String, nullable=False)
+    region = Column(String)  # The city / location the camp was assessed under.
+    lat = Column(Float)
+    lon = Column(Float)
+    refugees = Column(Float)
+    water = Column(Float)
+    electricity = Column(Float)
+    food = Column(Float)
+    stay = Column(Float)
+    workers = Column(Float)
+    equipment = Column(Float)
+    washrooms = Column(Float)
+    bathrooms = Column(Float)
+    kits = Column(Float)
+    sanitation_score = Column(Float, nullable=False)
+    overall_score = Column(Float, nullable=False)
+    compliance = Column(String, nullable=False)
+    assessed_at = Column(DateTime, nullable=False, index=True)
+    __table_args__ = (Index("ix_hygiene_assessments_camp_time", "camp", "assessed_at"),)
+
+# Per camp and day aggregates, updated incrementally on every insert.
+class HygieneDailyRollup(Base):
+    __tablename__ = "hygiene_daily_rollups"
+    camp = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    region = Column(String)
+    assessments = Column(Integer, nullable=False)
+    overall_sum = Column(Float, nullable=False)
+    overall_min = Column(Float, nullable=False)
+    overall_max = Column(Float, nullable=False)
+    sanitation_sum = Column(Float, nullable=False)
+    __table_args__ = (
+        Index("ix_hygiene_daily_rollups_day", "day"),
+        Index("ix_hygiene_daily_rollups_region_day", "region", "day"),
+    )
+
+_tables_ready = False
+_tables_lock = threading.Lock()
+
+def init_history():
+    """Create the history tables once per process."""
+    global _tables_ready
+    with _tables_lock:
+        if not _tables_ready:
+            Base.metadata.create_all(bind=engine, tables=[HygieneAssessment.__table__, HygieneDailyRollup.__table__])
+            _tables_ready = True
+
+def record_assessments(assessments, assessed_at=None):
+    """
+    Append assessments and fold them into the daily rollups in one transaction.
+
+    Parameters:
+        assessments (DataFrame): Rows with `camp`, `sanitation_score`, `overall_score`,
+            `compliance` and optionally `region` (or `city`), `lat`, `lon`, the input
+            metric columns and `assessed_at`.
+        assessed_at (datetime): Timestamp for rows without one (default: now, UTC).
+
+    Returns:
+        int: Number of rows inserted.
+    """
+    init_history()
+    if len(assessments) == 0:
+        return 0
+    rows = assessments.copy()
+    if "region" not in rows and "city" in rows:
+        rows["region"] = rows["city"]
+    if "assessed_at" not in rows:
+        rows["assessed_at"] = assessed_at or datetime.now(timezone.utc).replace(tzinfo=None)
+    rows["assessed_at"] = pd.to_datetime(rows["assessed_at"])
+    rows["day"] = rows["assessed_at"].dt.date
+    if "region" not in rows:
+        rows["region"] = None
+    daily = rows.groupby(["camp", "day"], sort=False).agg(
+        region=("region", "last"),
+        assessments=("overall_score", "size"),
+        overall_sum=("overall_score", "sum"),
+        overall_min=("overall_score", "min"),
+        overall_max=("overall_score", "max"),
+        sanitation_sum=("sanitation_score", "sum"),
+    ).reset_index()
+
+    # The log is written through one driver-level executemany: building per-row dicts and
+    # binding them through SQLAlchemy costs more than the insert itself at this volume.
+    # Timestamps use the same text format as SQLAlchemy's SQLite DateTime type.
+    rows["assessed_at"] = rows["assessed_at"].dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+    columns = [c.name for c in HygieneAssessment.__table__.columns if c.name != "id" and c.name in rows]
+    insert_sql = (f"INSERT INTO {HygieneAssessment.__tablename__} ({', '.join(columns)}) "
+                  f"VALUES ({', '.join('?' * len(columns))})")
+
+    upsert = sqlite_insert(HygieneDailyRollup.__table__)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=["camp", "day"],
+        set_={
+            "region": func.coalesce(upsert.excluded.region, HygieneDailyRollup.region),
+            "assessments": HygieneDailyRollup.assessments + upsert.excluded.assessments,
+            "overall_sum": HygieneDailyRollup.overall_sum + upsert.excluded.overall_sum,
+            "overall_min": func.min(HygieneDailyRollup.overall_min, upsert.excluded.overall_min),
+            "overall_max": func.max(HygieneDailyRollup.overall_max, upsert.excluded.overall_max),
+            "sanitation_sum": HygieneDailyRollup.sanitation_sum + upsert.excluded.sanitation_sum,
+        },
+    )
+    with engine.begin() as conn:
+        conn.exec_driver_sql(insert_sql, _as_params(rows[columns]))
+        conn.execute(upsert, daily.astype(object).where(daily.notna(), None).to_dict("records"))
+    return len(rows)
+
+def _as_params(frame):
+    """DataFrame rows as tuples of plain Python values, with NaN as None."""
+    return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+def record_assessment(camp, region, inputs, sanitation_score, overall_score, compliance,
+                      location=None, assessed_at=None):
+    """Record a single assessment; `inputs` maps metric names to values."""
+    row = {"camp": camp, "region": region, "sanitation_score": sanitation_score,
+           "overall_score": overall_score, "compliance": compliance, **inputs}
+    if location:
+        row["lat"], row["lon"] = location
+    return record_assessments(pd.DataFrame([row]), assessed_at=assessed_at)
+
+def _day(value):
+    return value.date() if isinstance(value, datetime) else value
+
+def worst_camps(since, until=None, limit=50):
+    """
+    Camps with the lowest average overall score between two days (inclusive),
+    read from the daily rollups only.
+    """
+    init_history()
+    average = (func.sum(HygieneDailyRollup.overall_sum) / func.sum(HygieneDailyRollup.assessments)).label("average_score")
+    query = (
+        select(HygieneDailyRollup.camp, func.max(HygieneDailyRollup.region).label("region"), average,
+               func.min(HygieneDailyRollup.overall_min).label("lowest_score"),
+               func.sum(HygieneDailyRollup.assessments).label("assessments"))
+        .where(HygieneDailyRollup.day >= _day(since))
+        .group_by(HygieneDailyRollup.camp)
+        .order_by(average)
+        .limit(limit)
+    )
+    if until is not None:
+        query = query.where(HygieneDailyRollup.day <= _day(until))
+    with engine.connect() as conn:
+        return pd.DataFrame(conn.execute(query).mappings().all(),
+                            columns=["camp", "region", "average_score", "lowest_score", "assessments"])
+
+def worst_camps_this_week(limit=50):
+    """Worst camps over the last seven days (UTC)."""
+    return worst_camps(datetime.now(timezone.utc).date() - timedelta(days=6), limit=limit)
+
+def _trend(condition, since):
+    init_history()
+    query = (
+        select(HygieneDailyRollup.day,
+               (func.sum(HygieneDailyRollup.overall_sum) / func.sum(HygieneDailyRollup.assessments)).label("average_score"),
+               func.min(HygieneDailyRollup.overall_min).label("lowest_score"),
+               func.max(HygieneDailyRollup.overall_max).label("highest_score"),
+               func.sum(HygieneDailyRollup.assessments).label("assessments"))
+        .where(condition)
+        .group_by(HygieneDailyRollup.day)
+        .order_by(HygieneDailyRollup.day)
+    )
+    if since is not None:
+        query = query.where(HygieneDailyRollup.day >= _day(since))
+    with engine.connect() as conn:
+        return pd.DataFrame(conn.execute(query).mappings().all(),
+                            columns=["day", "average_score", "lowest_score", "highest_score", "assessments"])
+
+def camp_trend(camp, since=None):
+    """Daily score trend for one camp."""
+    return _trend(HygieneDailyRollup.camp == camp, since)
+
+def region_trend(region, since=None):
+    """Daily score trend across all camps of a region."""
+    return _trend(HygieneDailyRollup.region == region, since)
+
+def camps(limit=None):
+    """Names of the camps that have history, alphabetically."""
+    init_history()
+    query = select(HygieneDailyRollup.camp).distinct().order_by(HygieneDailyRollup.camp).limit(limit)
+    with engine.connect() as conn:
+        return list(conn.execute(query).scalars())
@@ -1,14 +1,49 @@
 # modules/auth.py
+import csv
+import io
+import os
+import threading
+
 import streamlit as st
 import hashlib
-from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy import bindparam, create_engine, event, insert, select, update, Column, Integer, String
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from modules.tracing import traced
+
+DATABASE_URL = os.environ.get("AUTH_DATABASE_URL", "sqlite:///database.db")
+# Connections kept open per process, and extra ones allowed under bursts of logins.
+POOL_SIZE = int(os.environ.get("AUTH_POOL_SIZE", 10))
+MAX_OVERFLOW = int(os.environ.get("AUTH_MAX_OVERFLOW", 20))
+# Seconds a writer waits for SQLite's lock before failing with "database is locked".
+BUSY_TIMEOUT = 30
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
 # Set up the SQLite database connection
-engine = create_engine("sqlite:///database.db", connect_args={"check_same_thread": False})
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT} if IS_SQLITE else {},
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW,
+    pool_timeout=BUSY_TIMEOUT,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def _configure_sqlite(dbapi_connection, connection_record):
+    # WAL lets readers (logins) proceed while a writer (registration) commits;
+    # synchronous=NORMAL is the recommended durability level for WAL.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _configure_sqlite)
+
 # Define a User model for our database
 class User(Base):
     __tablename__ = "users"
@@ -17,11 +52,21 @@ class User(Base):
     password = Column(String, nullable=False)  # In production, use a robust password hashing method.
     role = Column(String, default="user")  # Role can be used for authorization (e.g., admin, user)
 
+_db_ready = False
+_db_lock = threading.Lock()
+
 def init_db():
     """
     Initialize the database and create tables if they do not exist.
+    Runs once per process; later calls (every Streamlit rerun) return immediately.
     """
-    Base.metadata.create_all(bind=engine)
+    global _db_ready
+    if _db_ready:
+        return
+    with _db_lock:
+        if not _db_ready:
+            Base.metadata.create_all(bind=engine)
+            _db_ready = True
 
 def hash_password(password):
     """
@@ -30,38 +75,117 @@ def hash_password(password):
     """
     return hashlib.sha256(password.encode()).hexdigest()
 
+@traced("auth.register_user")
 def register_user(username, password, role="user"):
     """
     Register a new user. Returns a tuple: (success, message).
     """
-    db = SessionLocal()
-    # Check if the username already exists.
-    existing_user = db.query(User).filter(User.username == username).first()
-    if existing_user:
-        db.close()
-        return False, "Username already exists."
-    # Create a new user with the hashed password.
-    new_user = User(username=username, password=hash_password(password), role=role)
-    db.add(new_user)
-    db.commit()
-    db.close()
+    # A single INSERT; the unique index on username rejects duplicates.
+    with SessionLocal() as db:
+        db.add(User(username=username, password=hash_password(password), role=role))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False, "Username already exists."
     return True, "User registered successfully."
 
+@traced("auth.authenticate_user")
 def authenticate_user(username, password):
     """
     Authenticate a user against the database.
     Returns a tuple: (True/False, role or None).
     """
-    db = SessionLocal()
-    user = db.query(User).filter(
-        User.username == username,
-        User.password == hash_password(password)
-    ).first()
-    db.close()
-    if user:
-        return True, user.role
+    with SessionLocal() as db:
+        role = db.execute(
+            select(User.role).where(User.username == username, User.password == hash_password(password))
+        ).first()
+    if role:
+        return True, role[0]
     return False, None
 
+CONFLICT_MODES = ("skip", "update", "error")
+
+def _insert_new(conn, users):
+    """Insert the users whose username is not taken yet; returns how many were inserted."""
+    table = User.__table__
+    dialect = {"sqlite": sqlite, "postgresql": postgresql}.get(conn.dialect.name)
+    if dialect is not None:
+        stmt = dialect.insert(table).on_conflict_do_nothing(index_elements=["username"])
+        if dialect is sqlite:
+            # sqlite3 sums the changes of every row, and skipped rows change nothing.
+            return conn.execute(stmt, users).rowcount
+        # psycopg's executemany rowcount is unreliable; count the rows that come back instead.
+        return len(conn.execute(stmt.returning(table.c.username), users).all())
+    if conn.dialect.name in ("mysql", "mariadb"):
+        return conn.execute(insert(table).prefix_with("IGNORE"), users).rowcount
+    raise ValueError(f"Bulk import does not support the {conn.dialect.name} database.")
+
+@traced("auth.import_users")
+def import_users(rows, on_conflict="skip", default_role="user"):
+    """
+    Create many users in one transaction.
+
+    Parameters:
+        rows (iterable of dict): `username`, `password` and optionally `role`. Rows
+            with a blank username or password are not imported; when a username repeats
+            within `rows`, the last row wins.
+        on_conflict (str): For usernames that already exist: "skip" them, "update" their
+            password and role, or "error" to roll the whole import back and raise
+            ValueError.
+        default_role (str): Role for rows without one.
+
+    Returns:
+        dict: Counts of `inserted`, `updated`, `skipped` and `invalid` rows.
+    """
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f"on_conflict must be one of {CONFLICT_MODES}, got {on_conflict!r}")
+    init_db()
+    users, invalid = {}, 0
+    for row in rows:
+        username = (row.get("username") or "").strip()
+        password = row.get("password") or ""
+        if not username or not password:
+            invalid += 1
+            continue
+        users[username] = {"username": username, "password": hash_password(password),
+                           "role": (row.get("role") or "").strip() or default_role}
+    if not users:
+        return {"inserted": 0, "updated": 0, "skipped": 0, "invalid": invalid}
+
+    rows = list(users.values())
+    with engine.begin() as conn:
+        # Core executemany statements; mapping thousands of ORM objects costs more than the insert.
+        if on_conflict == "error":
+            try:
+                conn.execute(insert(User.__table__), rows)
+            except IntegrityError as e:
+                raise ValueError("Some usernames already exist; nothing was imported.") from e
+            inserted = len(rows)
+        else:
+            inserted = _insert_new(conn, rows)
+        if on_conflict == "update" and inserted < len(users):
+            # Rows inserted just above are rewritten with the same values.
+            table = User.__table__
+            conn.execute(update(table).where(table.c.username == bindparam("b_username"))
+                         .values(password=bindparam("b_password"), role=bindparam("b_role")),
+                         [{"b_username": u["username"], "b_password": u["password"], "b_role": u["role"]} for u in rows])
+    existing = len(users) - inserted
+    updated, skipped = (existing, 0) if on_conflict == "update" else (0, existing)
+    return {"inserted": inserted, "updated": updated, "skipped": skipped, "invalid": invalid}
+
+def import_users_csv(source, on_conflict="skip", default_role="user"):
+    """
+    `import_users` for a CSV file (path, text or binary file object) with a header
+    row naming `username`, `password` and optionally `role`.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8") as f:
+            return import_users(csv.DictReader(f), on_conflict, default_role)
+    if isinstance(source.read(0), bytes):
+        source = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    return import_users(csv.DictReader(source), on_conflict, default_role)
+
 def login():
     """
     Display the login (and registration) form and handle user authentication.
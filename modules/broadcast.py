@@ -0,0 +1,112 @@
+# modules/broadcast.py
+import io
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import streamlit as st
+
+from modules.cultural_integration import get_cultural_insights
+from modules.healthcare_chatbot import get_medical_advice_ai
+from modules.translation import LANGUAGES, translate
+from modules.tts_cache import get_audio_cache
+
+ADVISORY_KINDS = ["Health advisory", "Cultural notice", "Custom text"]
+
+def generate_advisory(kind, subject):
+    """English advisory text: medical advice for symptoms, cultural insights for a country, or `subject` itself."""
+    if kind == "Health advisory":
+        return get_medical_advice_ai(subject)
+    if kind == "Cultural notice":
+        return get_cultural_insights(subject)
+    return subject
+
+def _render(text, lang, source, audio):
+    """
+    Translated text and (optionally) its MP3 audio in one language. Both are cached
+    per language, in the translation memory and the audio cache. The audio is read
+    into memory here, so evicting the cached file later cannot break the page or the zip.
+    """
+    start = time.perf_counter()
+    translated = text if lang == source else translate(text, lang, src=source)
+    audio_bytes = get_audio_cache().read(translated, lang) if audio else None
+    return {"text": translated, "audio": audio_bytes, "seconds": time.perf_counter() - start}
+
+def iter_broadcast(text, languages=None, source="en", audio=True):
+    """
+    Translate and synthesize one text for several languages concurrently.
+
+    Parameters:
+        text (str): The advisory, written in `source`.
+        languages (iterable of str): Target language codes (default: all of LANGUAGES).
+        source (str): Language code of `text`.
+        audio (bool): Also synthesize gTTS audio.
+
+    Yields:
+        (lang, result): In completion order; result has `text`, `audio` (MP3 bytes,
+        or None) and `seconds`, or `error` if that language failed.
+    """
+    languages = list(LANGUAGES.values() if languages is None else languages)
+    with ThreadPoolExecutor(max_workers=len(languages) or 1, thread_name_prefix="broadcast") as pool:
+        futures = {pool.submit(_render, text, lang, source, audio): lang for lang in languages}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], {"text": None, "audio": None, "error": str(e)}
+
+def broadcast(text, languages=None, source="en", audio=True):
+    """`iter_broadcast` collected into {lang: result}, in the order of `languages`."""
+    languages = list(LANGUAGES.values() if languages is None else languages)
+    results = dict(iter_broadcast(text, languages, source, audio))
+    return {lang: results[lang] for lang in languages}
+
+def bundle_zip(results, name="advisory"):
+    """Zip archive with `<name>_<lang>.txt` and `<name>_<lang>.mp3` for every successful language."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for lang, result in results.items():
+            if result.get("text"):
+                archive.writestr(f"{name}_{lang}.txt", result["text"])
+            if result.get("audio"):
+                # MP3 is already compressed.
+                archive.writestr(f"{name}_{lang}.mp3", result["audio"], compress_type=zipfile.ZIP_STORED)
+    return buffer.getvalue()
+
+def app():
+    st.title("Multilingual Broadcast")
+    st.write("Generate one notice and publish it in every supported language, as text and audio.")
+    kind = st.radio("Content", ADVISORY_KINDS, horizontal=True)
+    subject = st.text_area({"Health advisory": "Symptoms or health topic:",
+                            "Cultural notice": "Country:",
+                            "Custom text": "Notice text (English):"}[kind])
+    names = st.multiselect("Languages", list(LANGUAGES), default=list(LANGUAGES))
+    audio = st.checkbox("Include audio", value=True)
+    if not st.button("Broadcast") or not subject.strip() or not names:
+        return
+
+    start = time.perf_counter()
+    with st.spinner("Generating the notice..."):
+        text = generate_advisory(kind, subject)
+    codes = {LANGUAGES[name]: name for name in names}
+    progress = st.progress(0.0, text=f"Publishing in {len(codes)} languages...")
+    results = {}
+    for lang, result in iter_broadcast(text, list(codes), audio=audio):
+        results[lang] = result
+        progress.progress(len(results) / len(codes), text=f"{codes[lang]} ready ({len(results)} / {len(codes)})")
+    results = {lang: results[lang] for lang in codes}
+    st.caption(f"Published in {len(codes)} languages in {time.perf_counter() - start:.1f} s")
+
+    for lang, result in results.items():
+        with st.expander(codes[lang], expanded=lang == next(iter(codes))):
+            if result.get("error"):
+                st.error(f"Could not publish in {codes[lang]}: {result['error']}")
+                continue
+            st.write(result["text"])
+            if result["audio"]:
+                st.audio(result["audio"], format="audio/mp3")
+    st.dataframe(pd.DataFrame([{"language": codes[lang], "seconds": round(result.get("seconds", 0.0), 2),
+                                "error": result.get("error")}
+                               for lang, result in results.items()]))
+    st.download_button("Download all languages (zip)", bundle_zip(results), "broadcast.zip", "application/zip")
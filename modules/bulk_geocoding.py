@@ -0,0 +1,139 @@
+# modules/bulk_geocoding.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+import streamlit as st
+from geopy.exc import GeocoderTimedOut
+
+from modules.geocoding import get_geocoder, normalize_query
+from modules.tracing import span
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls at least 1 / rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+def _lookup(provider, name, limiter, max_retries, backoff):
+    """
+    Provider call with rate limiting and exponential backoff on timeouts. Any other
+    provider error (HTTP, SSL, ...) fails this name only, never the whole bulk run.
+    """
+    for attempt in range(max_retries + 1):
+        limiter.wait()
+        try:
+            with span("nominatim.geocode"):
+                return "resolved", provider.geocode(name)
+        except GeocoderTimedOut:
+            if attempt == max_retries:
+                return "failed", None
+            time.sleep(backoff * 2 ** attempt)
+        except Exception:
+            return "failed", None
+
+def geocode_names(names, geocoder=None, max_workers=4, rate_limit=1.0, max_retries=3, backoff=1.0):
+    """
+    Geocode many place names, yielding results as they are resolved.
+
+    Names are deduplicated by their normalized form. Cached answers are yielded first;
+    the misses go to the geocoder's provider through a thread pool that shares one
+    rate limiter (Nominatim's usage policy allows 1 request per second). Timeouts
+    are retried with exponential backoff, and every provider answer is written
+    back to the geocoder's caches.
+
+    Parameters:
+        names (iterable of str): Place names, duplicates allowed.
+        geocoder (Geocoder): Defaults to the process-wide geocoder.
+        max_workers (int): Concurrent provider requests.
+        rate_limit (float): Maximum provider requests per second (None for no limit).
+        max_retries (int): Retries per name after a timeout.
+        backoff (float): Initial backoff in seconds, doubled on each retry.
+
+    Yields:
+        row (dict): `name`, `lat`, `lon` and `status` ("cached", "resolved",
+        "not found" or "failed"), one per distinct name.
+    """
+    geocoder = geocoder or get_geocoder()
+    unique = {}
+    for name in names:
+        key = normalize_query(name)
+        if key and key not in unique:
+            unique[key] = str(name).strip()
+
+    def row(name, status, result):
+        if result is None and status != "failed":
+            status = "not found"
+        lat, lon = result if result else (None, None)
+        return {"name": name, "lat": lat, "lon": lon, "status": status}
+
+    misses = []
+    for name in unique.values():
+        found, result = geocoder.cached(name)
+        if found:
+            yield row(name, "cached", result)
+        else:
+            misses.append(name)
+    if not misses:
+        return
+    if geocoder.offline or geocoder.provider is None:
+        for name in misses:
+            yield row(name, "failed", None)
+        return
+
+    limiter = RateLimiter(rate_limit)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_lookup, geocoder.provider, name, limiter, max_retries, backoff): name
+                   for name in misses}
+        for future in as_completed(futures):
+            name = futures[future]
+            status, result = future.result()
+            if status == "resolved":
+                geocoder.store(name, result)
+            yield row(name, status, result)
+
+def geocode_table(table, column="name", **kwargs):
+    """
+    Resolve the distinct place names in `table[column]`.
+
+    Returns:
+        DataFrame: One row per distinct name with `name`, `lat`, `lon` and `status`.
+        The `name, lat, lon` columns make it directly usable as a store catalog source
+        and as the location table of a bulk hygiene audit.
+    """
+    rows = list(geocode_names(table[column].dropna(), **kwargs))
+    return pd.DataFrame(rows, columns=["name", "lat", "lon", "status"])
+
+def bulk_geocoding_app(key):
+    """Upload a CSV of place names, geocode it with live progress and offer the result as a CSV."""
+    uploaded = st.file_uploader("Camp list (CSV with a `name` column)", type=["csv"], key=f"{key}_upload")
+    rate_limit = st.number_input("Provider requests per second", min_value=0.1, max_value=50.0, value=1.0,
+                                 key=f"{key}_rate")
+    if not uploaded or not st.button("Geocode Camp List", key=f"{key}_button"):
+        return
+    table = pd.read_csv(uploaded)
+    if "name" not in table:
+        st.error("The CSV must have a `name` column.")
+        return
+    keys = table["name"].dropna().map(normalize_query)
+    total = keys[keys != ""].nunique()
+    progress = st.progress(0.0, text=f"Resolving {total} distinct names...")
+    rows = []
+    for row in geocode_names(table["name"].dropna(), rate_limit=rate_limit):
+        rows.append(row)
+        progress.progress(len(rows) / max(total, 1), text=f"{len(rows)} / {total} resolved")
+    resolved = pd.DataFrame(rows, columns=["name", "lat", "lon", "status"])
+    st.dataframe(resolved)
+    st.download_button("Download resolved table", resolved.to_csv(index=False), "geocoded_camps.csv",
+                       "text/csv", key=f"{key}_download")
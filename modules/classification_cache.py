@@ -0,0 +1,163 @@
+# modules/classification_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from modules.sqlite_cache import SQLiteCache
+
+CLASSIFICATION_CACHE_PATH = os.environ.get("CLASSIFICATION_CACHE_PATH", "data/classification_cache.sqlite")
+
+def content_hash(data):
+    """SHA-256 hex digest of the raw image bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+def dhash(gray, size=8):
+    """
+    64-bit difference hash of a grayscale PIL image: one bit per horizontally adjacent
+    pixel pair of a (size + 1) x size thumbnail. Re-encoded or resized copies of a
+    photo land within a few bits of each other.
+    """
+    pixels = np.asarray(gray.resize((size + 1, size), Image.Resampling.BILINEAR), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+def _hamming(hashes, value):
+    """Bit distance between every entry of a uint64 array and one hash."""
+    diff = np.bitwise_xor(hashes, np.uint64(value))
+    return np.unpackbits(diff.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+class ClassificationCache(SQLiteCache):
+    """
+    Two-level cache of classification results.
+
+    Results are keyed by the SHA-256 of the image bytes, so a hit never decodes the
+    image. An in-memory LRU sits in front of a SQLite table that keeps about
+    `max_entries` results: every `evict_every` puts, the least recently used rows
+    beyond that limit are deleted. Entries may also
+    carry a perceptual hash; `get_similar` then matches near-duplicate photos within
+    `max_distance` bits. Rows are scoped by `version`, so changing the classifier
+    never serves results computed by an older one.
+    """
+
+    def __init__(self, path=CLASSIFICATION_CACHE_PATH, version="1", memory_size=1024, max_entries=100_000,
+                 max_distance=4, evict_every=1000):
+        super().__init__(path, (
+            "CREATE TABLE IF NOT EXISTS classification_cache ("
+            "version TEXT NOT NULL, key TEXT NOT NULL, phash INTEGER, result TEXT NOT NULL, "
+            "last_used REAL NOT NULL, PRIMARY KEY (version, key))",
+            "CREATE INDEX IF NOT EXISTS ix_classification_cache_last_used ON classification_cache (last_used)",
+        ), memory_size)
+        self.version = version
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.evict_every = evict_every
+        self._puts_since_eviction = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "similar_hits": 0, "misses": 0}
+        # Perceptual hash by content hash; `_phash_index` is the (keys, uint64 array) view of it.
+        self._phashes = {}
+        self._phash_index = None
+        if self._db is not None:
+            self._reload_phashes()
+
+    def _remember(self, key, result):
+        evicted = super()._remember(key, result)
+        if self._db is None and self._phashes.pop(evicted, None) is not None:
+            self._phash_index = None
+        return evicted
+
+    def _lookup(self, key):
+        found, result = self._recall(key)
+        if found:
+            return result, "memory_hits"
+        if self._db is not None:
+            row = self._db.execute("SELECT result FROM classification_cache WHERE version = ? AND key = ?", (self.version, key)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE classification_cache SET last_used = ? WHERE version = ? AND key = ?",
+                                 (time.time(), self.version, key))
+                self._db.commit()
+                result = json.loads(row[0])
+                self._remember(key, result)
+                return result, "disk_hits"
+        return None, None
+
+    def get(self, key):
+        """Cached result for a content hash, or None (counted as a miss)."""
+        with self._lock:
+            result, layer = self._lookup(key)
+            self.counters[layer or "misses"] += 1
+            return result
+
+    def get_similar(self, phash):
+        """
+        Cached result of a near-duplicate image, or None. Call after `get` missed; a
+        match turns that miss into a similar hit.
+        """
+        with self._lock:
+            if not self._phashes:
+                return None
+            if self._phash_index is None:
+                self._phash_index = list(self._phashes), np.array(list(self._phashes.values()), dtype=np.uint64)
+            keys, hashes = self._phash_index
+            distances = _hamming(hashes, phash)
+            best = int(np.argmin(distances))
+            if distances[best] > self.max_distance:
+                return None
+            result, _ = self._lookup(keys[best])
+            if result is not None:
+                self.counters["misses"] -= 1
+                self.counters["similar_hits"] += 1
+            return result
+
+    def put(self, key, result, phash=None):
+        """Store a result under its content hash (and perceptual hash, if given)."""
+        with self._lock:
+            self._remember(key, result)
+            if phash is not None and self._phashes.get(key) != phash:
+                self._phashes[key] = phash
+                self._phash_index = None
+            if self._db is None:
+                return
+            signed = None if phash is None else phash - (1 << 64) if phash >= 1 << 63 else phash
+            self._db.execute(
+                "INSERT OR REPLACE INTO classification_cache (version, key, phash, result, last_used) "
+                "VALUES (?, ?, ?, ?, ?)", (self.version, key, signed, json.dumps(result), time.time()))
+            self._puts_since_eviction += 1
+            if self._puts_since_eviction >= self.evict_every:
+                # COUNT(*) scans the whole table, so the size is only checked now and then.
+                self._puts_since_eviction = 0
+                count = self._db.execute("SELECT COUNT(*) FROM classification_cache").fetchone()[0]
+                if count > self.max_entries:
+                    self._db.execute(
+                        "DELETE FROM classification_cache WHERE rowid IN ("
+                        "SELECT rowid FROM classification_cache ORDER BY last_used LIMIT ?)", (count - self.max_entries,))
+                    self._reload_phashes()
+            self._db.commit()
+
+    def _reload_phashes(self):
+        rows = self._db.execute("SELECT key, phash FROM classification_cache WHERE version = ? AND phash IS NOT NULL",
+                                (self.version,)).fetchall()
+        self._phashes = {key: phash & 0xFFFFFFFFFFFFFFFF for key, phash in rows}
+        self._phash_index = None
+
+    def stats(self):
+        """Hit/miss counters plus the overall hit rate."""
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = sum(stats.values())
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        return stats
+
+_default_caches = {}
+_default_lock = threading.Lock()
+
+def get_classification_cache(version="1"):
+    """Process-wide ClassificationCache for one classifier version."""
+    with _default_lock:
+        if version not in _default_caches:
+            _default_caches[version] = ClassificationCache(version=version)
+        return _default_caches[version]
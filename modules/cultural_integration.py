@@ -1,16 +1,14 @@
 import streamlit as st
-from googletrans import Translator
-from gtts import gTTS
-import io
-import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 load_dotenv()
-import google.generativeai as genai
+from modules.llm_cache import cached_model
+from modules.streaming import latency_caption, tee_sentences, timed
+from modules.tracing import traced, traced_stream
+from modules.translation import LANGUAGES, translate
+from modules.tts_cache import TTS_CHUNK_CHARS, get_audio_cache
 
 
-# Configure the Gemini API using the environment variable GEMINI_API_KEY.
-genai.configure(api_key=os.environ["GEMINI_API_KEY"])
-
 # Set up generation configuration parameters.
 generation_config = {
     "temperature": 1,
@@ -20,12 +18,17 @@ generation_config = {
     "response_mime_type": "text/plain",
 }
 
-# Create the Gemini model instance.
-model = genai.GenerativeModel(
-    model_name="gemini-2.0-flash",
-    generation_config=generation_config,
-)
+# Create the Gemini model instance (calls go through the shared LLM response cache).
+model = cached_model("gemini-2.0-flash", generation_config)
+
+def cultural_prompt(country):
+    return (
+        f"You are a helpful and empathetic healthcare assistant. "
+        f"The user wants to know some cultural traditions about {country}\n\n"
+        "Provide short, empathetic, and ethiclaly cautious cultural information . "
+    )
 
+@traced("get_cultural_insights")
 def get_cultural_insights(country):
     """
     Generate healthcare advice based on the user's symptoms using the Gemini API.
@@ -37,35 +40,50 @@ def get_cultural_insights(country):
         advice (str): AI-generated healthcare advice.
     """
     # Construct the prompt for the Gemini API.
-    prompt = (
-        f"You are a helpful and empathetic healthcare assistant. "
-        f"The user wants to know some cultural traditions about {country}\n\n"
-        "Provide short, empathetic, and ethiclaly cautious cultural information . "
-    )
+    prompt = cultural_prompt(country)
     
-    # Start a new chat session (with an empty history) and send the prompt.
-    chat_session = model.start_chat(history=[])
-    response = chat_session.send_message(prompt)
-    
-    # Retrieve the advice text from the response.
-    cultural_advice = response.text
+    # Send the prompt (answered from the response cache when it was asked recently).
+    cultural_advice = model.generate(prompt)
     try:
         return cultural_advice
     except:
         return "Cultural insights for this region are not available. Please try another country."
 
+@traced_stream("stream_cultural_insights")
+def stream_cultural_insights(country):
+    """Yield the cultural insights text as it is generated."""
+    return model.stream(cultural_prompt(country))
+
 
 
 
 
+@traced("translate_text")
 def translate_text(text, dest_language):
-    return Translator().translate(text, dest=dest_language).text
+    return translate(text, dest_language)
 
+@traced("text_to_speech")
 def text_to_speech(text, lang='en'):
-    audio_bytes = io.BytesIO()
-    gTTS(text=text, lang=lang).write_to_fp(audio_bytes)
-    audio_bytes.seek(0)
-    return audio_bytes
+    """Path of the cached MP3 file for `text`, synthesized with gTTS on a cache miss."""
+    return get_audio_cache().synthesize(text, lang)
+
+def iter_speech(text, lang='en'):
+    """MP3 file paths for `text` in playback order; long texts are synthesized chunk by chunk."""
+    return get_audio_cache().iter_speech(text, lang)
+
+def _play_ready(chunks, audio_parts, box):
+    """
+    Pass a text stream through, adding a player to `box` for each audio future in
+    `audio_parts` (in order) as soon as it is done; the rest are awaited at the end.
+    """
+    played = 0
+    for chunk in chunks:
+        yield chunk
+        while played < len(audio_parts) and audio_parts[played].done():
+            box.audio(audio_parts[played].result(), format='audio/mp3')
+            played += 1
+    for part in audio_parts[played:]:
+        box.audio(part.result(), format='audio/mp3')
 
 def app():
     st.title("AI-Powered Cultural Integration Hub")
@@ -73,16 +91,25 @@ def app():
     
     st.header("Cultural Insights")
     country = st.text_input("Enter a country for cultural insights:", value="USA")
+    listen = st.checkbox("Listen to Cultural Insights")
     if st.button("Get Cultural Insights"):
-        insights = get_cultural_insights(country)
         st.write("### Cultural Insights:")
-        st.write(insights)
-        if st.checkbox("Listen to Cultural Insights"):
-            st.audio(text_to_speech(insights, lang='en'), format='audio/mp3')
+        metrics, audio_parts = {}, []
+        text_box, caption_box, audio_box = st.container(), st.empty(), st.container()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            stream = stream_cultural_insights(country)
+            if listen:
+                # Each finished chunk is synthesized while the rest is still being generated,
+                # and its player appears below the text as soon as its audio is ready.
+                stream = tee_sentences(stream, lambda chunk: text_to_speech(chunk, lang='en'), pool, audio_parts,
+                                       min_chars=TTS_CHUNK_CHARS)
+                stream = _play_ready(stream, audio_parts, audio_box)
+            text_box.write_stream(timed(stream, metrics))
+            caption_box.caption(latency_caption(metrics))
     
     st.header("Translation Service")
     text_to_translate = st.text_area("Enter text to translate:")
-    target_language = st.selectbox("Select target language", ["en", "hi", "es", "fr", "de", "zh-cn"], index=0)
+    target_language = st.selectbox("Select target language", list(LANGUAGES.values()), index=0)
     output_format = st.radio("Select output format", ["Text", "Speech", "Both"], index=0)
     
     if st.button("Translate Text") and text_to_translate:
@@ -91,4 +118,5 @@ def app():
             st.write(f"### Translated Text ({target_language}):")
             st.write(translated)
         if output_format in ["Speech", "Both"]:
-            st.audio(text_to_speech(translated, lang=target_language), format='audio/mp3')
+            for path in iter_speech(translated, lang=target_language):
+                st.audio(path, format='audio/mp3')
@@ -1,106 +1,270 @@
 # modules/food_optimizer.py
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import streamlit as st
+import numpy as np
 import pandas as pd
-from pulp import LpProblem, LpMinimize, LpVariable, lpSum, LpStatus, value
+from modules.food_scenarios import run_scenarios, scenario_grid
+from modules.tracing import traced
+from modules.transport_solver import (
+    SOLVERS, TransportModel, balance, balance_lanes, dual_lower_bound, initial_basis, modi_improve, solve, solve_lanes,
+)
 
-def optimize_food_distribution(supply, demand, cost_matrix):
+@traced("optimize_food_distribution")
+def optimize_food_distribution(supply, demand, cost_matrix, solver="highs"):
     """
     Optimize food distribution using the transportation problem formulation.
     
     This function automatically balances the problem by adding a dummy supply
-    or dummy demand if total supply != total demand.
+    or dummy demand if total supply != total demand. The inputs are not modified.
     
     Parameters:
         supply (list): Food supply amounts for each supply center.
         demand (list): Food demand amounts for each demand location.
         cost_matrix (list of lists): Delivery cost from each supply center to each demand location.
+        solver (str): Backend from transport_solver.SOLVERS ("highs" or "pulp").
         
     Returns:
-        plan (list of lists): Matrix indicating the optimal shipment plan for the original supply centers and demand locations.
+        plan (ndarray): Matrix indicating the optimal shipment plan for the original supply centers and demand locations.
         total_cost (float): The minimized total transportation cost.
         status (str): The status of the LP solution (e.g., "Optimal", "Infeasible").
     """
-    original_num_supply = len(supply)
-    original_num_demand = len(demand)
-    total_supply = sum(supply)
-    total_demand = sum(demand)
-    dummy_added = False
-    dummy_type = None  # "supply" or "demand"
-    
-    # Balance the problem if necessary.
-    if total_supply < total_demand:
-        # Add a dummy supply center to absorb the extra demand.
-        dummy_supply = total_demand - total_supply
-        supply.append(dummy_supply)
-        # For the dummy supply, set cost=0 for all demand locations.
-        dummy_row = [0.0 for _ in range(original_num_demand)]
-        cost_matrix.append(dummy_row)
-        dummy_added = True
-        dummy_type = "supply"
-    elif total_supply > total_demand:
-        # Add a dummy demand location to absorb the extra supply.
-        dummy_demand = total_supply - total_demand
-        demand.append(dummy_demand)
-        # For each supply center, add a dummy cost of 0 for shipping to the dummy demand.
-        for i in range(original_num_supply):
-            cost_matrix[i].append(0.0)
-        dummy_added = True
-        dummy_type = "demand"
-    
-    # Update the number of supply centers and demand locations after balancing.
-    num_supply = len(supply)
-    num_demand = len(demand)
-    
-    # Create the LP problem.
-    prob = LpProblem("Food_Distribution_Optimization", LpMinimize)
-    
-    # Create decision variables: x[i][j] represents the shipment from supply i to demand j.
-    x = [[LpVariable(f"x_{i}_{j}", lowBound=0, cat="Continuous") 
-          for j in range(num_demand)] for i in range(num_supply)]
-    
-    # Objective: minimize total cost.
-    prob += lpSum(cost_matrix[i][j] * x[i][j] for i in range(num_supply) for j in range(num_demand)), "Total_Transportation_Cost"
-    
-    # Supply constraints: Each supply center ships exactly its available supply.
-    for i in range(num_supply):
-        prob += lpSum(x[i][j] for j in range(num_demand)) == supply[i], f"Supply_Constraint_{i}"
-    
-    # Demand constraints: Each demand location receives exactly its required demand.
-    for j in range(num_demand):
-        prob += lpSum(x[i][j] for i in range(num_supply)) == demand[j], f"Demand_Constraint_{j}"
-    
-    # Solve the problem.
-    prob.solve()
-    status = LpStatus[prob.status]
+    num_supply, num_demand = len(supply), len(demand)
+    balanced_supply, balanced_demand, cost = balance(supply, demand, cost_matrix)
+    full_plan, total_cost, status = solve(balanced_supply, balanced_demand, cost, solver=solver)
     if status != "Optimal":
         return None, None, status
     
-    # Extract the optimal plan.
-    full_plan = [[x[i][j].varValue for j in range(num_demand)] for i in range(num_supply)]
-    total_cost = value(prob.objective)
-    
-    # Remove the dummy row or column from the plan if one was added.
-    if dummy_added:
-        if dummy_type == "supply":
-            # Remove the dummy supply (last row).
-            plan = full_plan[:original_num_supply]
-        elif dummy_type == "demand":
-            # Remove the dummy demand (last column) from each row.
-            plan = [row[:original_num_demand] for row in full_plan]
-    else:
-        plan = full_plan
+    # Drop the dummy row or column, if one was added.
+    return full_plan[:num_supply, :num_demand], total_cost, status
+
+def preview_food_distribution(supply, demand, cost_matrix, method="vogel", improvement_passes=20):
+    """
+    Fast approximate plan for interactive editing, with an optimality gap estimate.
+    
+    Builds an initial plan with Vogel's approximation ("vogel") or the least-cost
+    method ("least_cost"), then applies up to `improvement_passes` MODI pivots. The
+    lower bound comes from dual-feasible potentials, so the true optimum lies between
+    `lower_bound` and `total_cost`.
+    
+    Parameters:
+        supply (list), demand (list), cost_matrix (list of lists): As for `optimize_food_distribution`.
+        method (str): "vogel" or "least_cost".
+        improvement_passes (int): Maximum number of MODI pivots (0 to skip).
+        
+    Returns:
+        plan (ndarray): Feasible shipment plan for the original centers and locations.
+        total_cost (float): Cost of the plan.
+        lower_bound (float): Lower bound on the optimal cost.
+        gap (float): Relative gap (total_cost - lower_bound) / total_cost.
+    """
+    num_supply, num_demand = len(supply), len(demand)
+    balanced_supply, balanced_demand, cost = balance(supply, demand, cost_matrix)
+    plan, rows, cols = initial_basis(balanced_supply, balanced_demand, cost, method=method)
+    plan, u, v = modi_improve(plan, rows, cols, cost, max_passes=improvement_passes)
+    total_cost = float((plan * cost).sum())
+    lower_bound = min(dual_lower_bound(balanced_supply, balanced_demand, cost, u, v), total_cost)
+    gap = (total_cost - lower_bound) / abs(total_cost) if total_cost else 0.0
+    return plan[:num_supply, :num_demand], total_cost, lower_bound, gap
+
+def _input_key(*arrays):
+    """Hash of the shapes and contents of the given arrays."""
+    digest = hashlib.sha1()
+    for array in arrays:
+        digest.update(repr(array.shape).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+class OptimizerSession:
+    """
+    Stateful optimizer for repeated re-plans of the same network.
+    
+    The session keeps the HiGHS TransportModel of the last solve in memory. When only
+    supply, demand or cost values change (same number of centers and locations), the
+    next solve starts from the previous optimal lane set instead of a cold start, which
+    typically takes a single restricted LP. Results are memoized by a hash of the
+    inputs, and the caller's lists are never modified.
+    """
+    
+    def __init__(self, cache_size=32):
+        self.cache_size = cache_size
+        self.model = None
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
     
+    def optimize(self, supply, demand, cost_matrix):
+        """
+        Same contract as `optimize_food_distribution` with the HiGHS backend.
+        """
+        supply = np.array(supply, dtype=float)
+        demand = np.array(demand, dtype=float)
+        cost = np.array(cost_matrix, dtype=float).reshape(len(supply), len(demand))
+        key = _input_key(supply, demand, cost)
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            plan, total_cost, status = self._results[key]
+            return (None if plan is None else plan.copy()), total_cost, status
+        
+        self.misses += 1
+        if self.model is None or self.model.shape != cost.shape:
+            self.model = TransportModel(cost)
+        else:
+            self.model.update_costs(cost)
+        plan, total_cost, status = self.model.solve(supply, demand)
+        self._results[key] = (plan, total_cost, status)
+        if len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return (None if plan is None else plan.copy()), total_cost, status
+
+def read_table(uploaded_file):
+    """
+    Read an uploaded CSV or Parquet file into a DataFrame, based on its file name.
+    """
+    if uploaded_file.name.lower().endswith((".parquet", ".pq")):
+        return pd.read_parquet(uploaded_file)
+    return pd.read_csv(uploaded_file)
+
+def optimize_route_distribution(supply, demand, lanes):
+    """
+    Optimize food distribution over an explicit list of routes (lanes).
+    
+    Only the listed center -> location lanes become decision variables, so sparse
+    route networks stay small. The problem is balanced with dummy lanes just like
+    `optimize_food_distribution`.
+    
+    Parameters:
+        supply (dict or Series): Food supply amount per supply center name.
+        demand (dict or Series): Food demand amount per demand location name.
+        lanes (DataFrame): Columns `center`, `location`, `cost` and an optional
+            `capacity` (missing or NaN means uncapacitated).
+        
+    Returns:
+        plan (DataFrame): One row per lane that carries food, with columns
+            `center`, `location`, `quantity` and `cost` (quantity * unit cost).
+        total_cost (float): The minimized total transportation cost.
+        status (str): The status of the LP solution (e.g., "Optimal", "Infeasible").
+    """
+    supply, demand = pd.Series(supply, dtype=float), pd.Series(demand, dtype=float)
+    rows = supply.index.get_indexer(lanes["center"])
+    cols = demand.index.get_indexer(lanes["location"])
+    if (rows < 0).any() or (cols < 0).any():
+        raise ValueError("Every lane must connect a known supply center to a known demand location.")
+    costs = lanes["cost"].to_numpy(dtype=float)
+    upper = None
+    if "capacity" in lanes:
+        upper = lanes["capacity"].fillna(np.inf).to_numpy(dtype=float)
+    
+    problem = balance_lanes(supply.to_numpy(), demand.to_numpy(), rows, cols, costs, upper)
+    flows, total_cost, status = solve_lanes(*problem)
+    if status != "Optimal":
+        return None, None, status
+    
+    flows = flows[:len(lanes)]
+    used = flows > 1e-9
+    plan = pd.DataFrame({
+        "center": lanes["center"].to_numpy()[used],
+        "location": lanes["location"].to_numpy()[used],
+        "quantity": flows[used],
+        "cost": flows[used] * costs[used],
+    })
     return plan, total_cost, status
 
+def scenario_sweep_app(supply, demand, cost_matrix):
+    st.write("Solve the instance above under a grid of supply/demand perturbations.")
+    factors_text = st.text_input("Multiplicative factors (comma-separated)", "0.6, 0.8, 1.0, 1.2")
+    supply_targets = st.multiselect("Perturb supply at", range(len(supply)), format_func=lambda i: f"Center {i+1}")
+    demand_targets = st.multiselect("Perturb demand at", range(len(demand)), format_func=lambda j: f"Location {j+1}")
+    max_workers = st.number_input("Worker processes", min_value=1, max_value=32, value=2)
+    
+    if st.button("Run Scenario Sweep", key="run_scenario_sweep_button"):
+        try:
+            factors = [float(f) for f in factors_text.split(",") if f.strip()]
+        except ValueError:
+            st.error("Factors must be numbers separated by commas.")
+            return
+        scenarios = scenario_grid(
+            supply={i: factors for i in supply_targets},
+            demand={j: factors for j in demand_targets},
+        )
+        st.write(f"Running {len(scenarios)} scenarios...")
+        table = st.empty()
+        rows = []
+        for result in run_scenarios(supply, demand, cost_matrix, scenarios, max_workers=max_workers):
+            rows.append({
+                "Scenario": result["scenario"],
+                "Status": result["status"],
+                "Total Cost": result["total_cost"],
+                "Cost Change": result["cost_change"],
+                "Changed Lanes": ", ".join(f"C{i+1}->L{j+1}" for i, j, _, _ in result["changed_lanes"]),
+            })
+            table.dataframe(pd.DataFrame(rows))
+
+def route_list_app():
+    st.write("Upload the route list and the supply/demand tables as CSV or Parquet files.")
+    lanes_file = st.file_uploader("Routes (center, location, cost, optional capacity)", type=["csv", "parquet"])
+    supply_file = st.file_uploader("Supply centers (center, supply)", type=["csv", "parquet"])
+    demand_file = st.file_uploader("Demand locations (location, demand)", type=["csv", "parquet"])
+    if not (lanes_file and supply_file and demand_file):
+        return
+    
+    lanes = read_table(lanes_file)
+    supply = read_table(supply_file).set_index("center")["supply"]
+    demand = read_table(demand_file).set_index("location")["demand"]
+    st.write(f"{len(lanes)} routes between {len(supply)} centers and {len(demand)} locations.")
+    
+    if st.button("Optimize Distribution", key="optimize_routes_button"):
+        try:
+            plan, total_cost, status = optimize_route_distribution(supply, demand, lanes)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        if status == "Optimal":
+            st.success("Optimization Successful!")
+            st.write("### Optimized Distribution Plan:")
+            st.dataframe(plan)
+            st.write(f"**Total Transportation Cost:** {total_cost:.2f}")
+        else:
+            st.error(f"Optimization Failed. Status: {status}")
+
+def _exact_solver(solver):
+    """Exact solve callable; resolved on the script thread since it reads st.session_state."""
+    if solver == "highs":
+        if "food_optimizer_session" not in st.session_state:
+            st.session_state["food_optimizer_session"] = OptimizerSession()
+        return st.session_state["food_optimizer_session"].optimize
+    return partial(optimize_food_distribution, solver=solver)
+
+def _show_plan(plan, total_cost):
+    st.write("### Optimized Distribution Plan:")
+    df_plan = pd.DataFrame(
+        plan,
+        index=[f"Center {i+1}" for i in range(len(plan))],
+        columns=[f"Location {j+1}" for j in range(len(plan[0]))]
+    )
+    st.dataframe(df_plan)
+    st.write(f"**Total Transportation Cost:** {total_cost:.2f}")
+
 def app():
     st.title("AI-Driven Food Distribution Optimizer")
     st.write("Optimize food distribution to minimize costs and reduce waste.\n\n"
              "Note: Ensure that the total supply equals the total demand, or the problem will be automatically balanced.")
     
-    # Sidebar inputs for number of supply centers and demand locations.
     st.sidebar.header("Input Data")
+    input_mode = st.sidebar.radio("Input Mode", ["Cost Matrix", "Route List"], index=0)
+    if input_mode == "Route List":
+        route_list_app()
+        return
+    
+    # Sidebar inputs for number of supply centers and demand locations.
     num_sources = st.sidebar.number_input("Number of Supply Centers", min_value=1, max_value=10, value=2)
     num_destinations = st.sidebar.number_input("Number of Demand Locations", min_value=1, max_value=10, value=2)
+    solver = st.sidebar.selectbox("Solver", list(SOLVERS), index=0)
+    live_preview = st.sidebar.checkbox("Live Preview", value=True)
     
     # Input fields for supply amounts.
     st.write("### Supply Amounts")
@@ -126,17 +290,32 @@ def app():
             row.append(cost)
         cost_matrix.append(row)
     
-    if st.button("Optimize Distribution", key="optimize_distribution_button"):
-        plan, total_cost, status = optimize_food_distribution(supply, demand, cost_matrix)
-        if status == "Optimal":
-            st.success("Optimization Successful!")
-            st.write("### Optimized Distribution Plan:")
-            df_plan = pd.DataFrame(
-                plan,
-                index=[f"Center {i+1}" for i in range(len(plan))],
-                columns=[f"Location {j+1}" for j in range(len(plan[0]))]
-            )
-            st.dataframe(df_plan)
-            st.write(f"**Total Transportation Cost:** {total_cost:.2f}")
-        else:
-            st.error(f"Optimization Failed. Status: {status}")
+    optimize_tab, sweep_tab = st.tabs(["Optimize", "Scenario Sweep"])
+    with optimize_tab:
+        clicked = st.button("Optimize Distribution", key="optimize_distribution_button")
+        if clicked or live_preview:
+            result = st.empty()
+            key = (solver, _input_key(*(np.asarray(values, dtype=float) for values in (supply, demand, cost_matrix))))
+            last = st.session_state.get("food_optimizer_last")
+            if last is not None and last[0] == key:
+                # Unchanged inputs (e.g. a rerun from the sweep tab): show the last plan without solving again.
+                plan, total_cost, status = last[1]
+            else:
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    exact = pool.submit(_exact_solver(solver), supply, demand, cost_matrix)
+                    if live_preview:
+                        plan, total_cost, lower_bound, gap = preview_food_distribution(supply, demand, cost_matrix)
+                        with result.container():
+                            st.info(f"Preview plan (within {gap:.1%} of optimal); computing the exact solution...")
+                            _show_plan(plan, total_cost)
+                    plan, total_cost, status = exact.result()
+                st.session_state["food_optimizer_last"] = (key, (plan, total_cost, status))
+            with result.container():
+                if status == "Optimal":
+                    st.success("Optimization Successful!")
+                    _show_plan(plan, total_cost)
+                else:
+                    st.error(f"Optimization Failed. Status: {status}")
+
+    with sweep_tab:
+        scenario_sweep_app(supply, demand, cost_matrix)
@@ -0,0 +1,108 @@
+# modules/food_scenarios.py
+import itertools
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from modules.process_pool import process_pool
+from modules.transport_solver import TransportModel
+
+# Per-worker state: the base instance and a TransportModel built once per process.
+_worker = {}
+
+def scenario_grid(supply=None, demand=None, cost=None):
+    """
+    Build the cartesian product of perturbation factors.
+
+    Parameters:
+        supply (dict): Supply center index -> list of multiplicative factors.
+        demand (dict): Demand location index -> list of multiplicative factors.
+        cost (dict): (center index, location index) -> list of multiplicative factors.
+
+    Returns:
+        scenarios (list of dict): One scenario per combination, each with a `name`
+        and `supply` / `demand` / `cost` dicts mapping an index to a factor.
+    """
+    axes = [("supply", key, factors) for key, factors in (supply or {}).items()]
+    axes += [("demand", key, factors) for key, factors in (demand or {}).items()]
+    axes += [("cost", key, factors) for key, factors in (cost or {}).items()]
+    scenarios = []
+    for combo in itertools.product(*[factors for _, _, factors in axes]):
+        scenario = {"name": "", "supply": {}, "demand": {}, "cost": {}}
+        for (kind, key, _), factor in zip(axes, combo):
+            scenario[kind][key] = factor
+        scenario["name"] = scenario_name(scenario)
+        scenarios.append(scenario)
+    return scenarios
+
+def scenario_name(scenario):
+    """Readable label such as `supply[3]x0.6, cost[0,2]x1.5`."""
+    parts = [f"supply[{i}]x{f:g}" for i, f in scenario.get("supply", {}).items()]
+    parts += [f"demand[{j}]x{f:g}" for j, f in scenario.get("demand", {}).items()]
+    parts += [f"cost[{i},{j}]x{f:g}" for (i, j), f in scenario.get("cost", {}).items()]
+    return ", ".join(parts) or "base"
+
+def apply_scenario(supply, demand, cost, scenario):
+    """Return perturbed copies of the supply, demand and cost arrays."""
+    supply, demand, cost = supply.copy(), demand.copy(), cost.copy()
+    for i, factor in scenario.get("supply", {}).items():
+        supply[i] *= factor
+    for j, factor in scenario.get("demand", {}).items():
+        demand[j] *= factor
+    for (i, j), factor in scenario.get("cost", {}).items():
+        cost[i, j] *= factor
+    return supply, demand, cost
+
+def _init_worker(supply, demand, cost, base_plan):
+    _worker.update(supply=supply, demand=demand, cost=cost, base_plan=base_plan,
+                   model=TransportModel(cost))
+
+def _solve_scenario(scenario):
+    supply, demand, cost = apply_scenario(_worker["supply"], _worker["demand"], _worker["cost"], scenario)
+    model = _worker["model"]
+    model.update_costs(cost)
+    plan, total_cost, status = model.solve(supply, demand)
+    changed = []
+    base_plan = _worker["base_plan"]
+    if plan is not None and base_plan is not None:
+        rows, cols = np.nonzero(~np.isclose(plan, base_plan, atol=1e-6))
+        changed = [(int(i), int(j), float(base_plan[i, j]), float(plan[i, j])) for i, j in zip(rows, cols)]
+    return {
+        "scenario": scenario.get("name") or scenario_name(scenario),
+        "status": status,
+        "total_cost": total_cost,
+        "changed_lanes": changed,
+    }
+
+def run_scenarios(supply, demand, cost_matrix, scenarios, max_workers=None):
+    """
+    Solve perturbations of a base instance across a process pool.
+
+    The base instance is shipped to every worker once, and each worker keeps a single
+    TransportModel, so scenarios only send their perturbation and re-solve from the
+    lane set of the previous one. Workers are started from a fork server (see
+    `process_pool`), never forked from the threaded app process.
+
+    Parameters:
+        supply (list), demand (list), cost_matrix (list of lists): The base instance.
+        scenarios (list of dict): Perturbations as produced by `scenario_grid`.
+        max_workers (int): Size of the process pool (default: number of CPUs).
+
+    Yields:
+        result (dict): `scenario`, `status`, `total_cost`, `cost_change` and
+        `changed_lanes` (list of (center, location, base quantity, new quantity)),
+        in completion order.
+    """
+    supply = np.asarray(supply, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    cost = np.asarray(cost_matrix, dtype=float)
+    base_plan, base_cost, _ = TransportModel(cost).solve(supply, demand)
+    with process_pool(max_workers, initializer=_init_worker, initargs=(supply, demand, cost, base_plan)) as pool:
+        futures = [pool.submit(_solve_scenario, scenario) for scenario in scenarios]
+        for future in as_completed(futures):
+            result = future.result()
+            result["cost_change"] = (
+                result["total_cost"] - base_cost
+                if result["total_cost"] is not None and base_cost is not None else None
+            )
+            yield result
@@ -0,0 +1,150 @@
+# modules/geocoding.py
+import csv
+import os
+import re
+import threading
+import time
+
+from geopy.exc import GeocoderServiceError, GeocoderTimedOut
+from geopy.geocoders import Nominatim
+
+from modules.sqlite_cache import SQLiteCache
+from modules.tracing import span, traced
+
+GEOCODE_CACHE_PATH = os.environ.get("GEOCODE_CACHE_PATH", "data/geocode_cache.sqlite")
+GAZETTEER_PATH = os.environ.get("GEOCODE_GAZETTEER_PATH", "data/gazetteer.csv")
+# Misses are remembered for a day; places get added to OpenStreetMap over time.
+NEGATIVE_TTL_SECONDS = 24 * 3600
+
+def normalize_query(query):
+    """Cache key for a place name: case-folded, whitespace collapsed, edge punctuation stripped."""
+    return re.sub(r"\s+", " ", str(query)).strip(" \t.,;:").casefold()
+
+class NominatimProvider:
+    """Network provider backed by a single, reused geopy Nominatim client."""
+
+    def __init__(self, user_agent="refugee_crisis_helper", timeout=10):
+        self.client = Nominatim(user_agent=user_agent)
+        self.timeout = timeout
+
+    def geocode(self, query):
+        location = self.client.geocode(query, timeout=self.timeout)
+        return (location.latitude, location.longitude) if location else None
+
+class StaticProvider:
+    """Offline stand-in provider answering from a {place name: (lat, lon)} mapping; counts calls."""
+
+    def __init__(self, places=None):
+        self.places = {normalize_query(name): tuple(coords) for name, coords in (places or {}).items()}
+        self.calls = 0
+
+    def geocode(self, query):
+        self.calls += 1
+        return self.places.get(normalize_query(query))
+
+def load_gazetteer(path):
+    """Read a `name, lat, lon` CSV into {normalized name: (lat, lon)}."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {normalize_query(row["name"]): (float(row["lat"]), float(row["lon"])) for row in csv.DictReader(f)}
+
+class Geocoder(SQLiteCache):
+    """
+    Geocoding service shared by the hygiene auditor and the store locator.
+
+    Lookups go through an in-memory LRU, then the local gazetteer, then a persistent
+    SQLite cache, and only then the provider. Both hits and misses are cached
+    (misses for `negative_ttl` seconds); provider timeouts and errors are not, so
+    they are retried on the next call. With `offline=True` the provider is never used.
+    """
+
+    def __init__(self, provider=None, cache_path=GEOCODE_CACHE_PATH, gazetteer=None,
+                 memory_size=4096, negative_ttl=NEGATIVE_TTL_SECONDS, offline=False):
+        super().__init__(cache_path, (
+            "CREATE TABLE IF NOT EXISTS geocode_cache ("
+            "query TEXT PRIMARY KEY, lat REAL, lon REAL, cached_at REAL NOT NULL)",
+        ), memory_size)
+        self.provider = provider
+        self.gazetteer = gazetteer or {}
+        self.negative_ttl = negative_ttl
+        self.offline = offline
+
+    def cached(self, query):
+        """
+        Look a place up without touching the provider.
+
+        Returns:
+            (found, result): found is False on a cache miss; result is (lat, lon) or
+            None (a cached negative answer).
+        """
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            # Memory entries are (result, cached_at); a remembered miss expires like a stored one.
+            found, entry = self._recall(key)
+            if found and (entry[0] is not None or now - entry[1] < self.negative_ttl):
+                return True, entry[0]
+            if key in self.gazetteer:
+                self._remember(key, (self.gazetteer[key], now))
+                return True, self.gazetteer[key]
+            if self._db is None:
+                return False, None
+            row = self._db.execute("SELECT lat, lon, cached_at FROM geocode_cache WHERE query = ?", (key,)).fetchone()
+            if row is not None:
+                lat, lon, cached_at = row
+                if lat is not None:
+                    self._remember(key, ((lat, lon), cached_at))
+                    return True, (lat, lon)
+                if now - cached_at < self.negative_ttl:
+                    self._remember(key, (None, cached_at))
+                    return True, None
+        return False, None
+
+    def store(self, query, result):
+        """Record a provider answer ((lat, lon) or None) in both cache layers."""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            self._remember(key, (result, now))
+            if self._db is not None:
+                lat, lon = result if result else (None, None)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (query, lat, lon, cached_at) VALUES (?, ?, ?, ?)",
+                    (key, lat, lon, now))
+                self._db.commit()
+
+    def geocode(self, query):
+        """Return (lat, lon) for a place name, or None if it cannot be resolved."""
+        if not normalize_query(query):
+            return None
+        found, result = self.cached(query)
+        if found or self.offline or self.provider is None:
+            return result
+        try:
+            with span("nominatim.geocode"):
+                result = self.provider.geocode(query)
+        except (GeocoderTimedOut, GeocoderServiceError):
+            return None
+        self.store(query, result)
+        return result
+
+_default_geocoder = None
+_default_lock = threading.Lock()
+
+def get_geocoder():
+    """Process-wide Geocoder with the Nominatim provider and the local gazetteer (if present)."""
+    global _default_geocoder
+    with _default_lock:
+        if _default_geocoder is None:
+            gazetteer = load_gazetteer(GAZETTEER_PATH) if os.path.exists(GAZETTEER_PATH) else None
+            _default_geocoder = Geocoder(provider=NominatimProvider(), gazetteer=gazetteer)
+        return _default_geocoder
+
+def set_geocoder(geocoder):
+    """Replace the process-wide Geocoder (e.g. with a StaticProvider-backed one in tests)."""
+    global _default_geocoder
+    with _default_lock:
+        _default_geocoder = geocoder
+
+@traced("geocode_city")
+def geocode_city(city_name):
+    return get_geocoder().geocode(city_name)
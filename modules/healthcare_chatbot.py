@@ -1,12 +1,12 @@
-import os
 import streamlit as st
-import google.generativeai as genai
-from googletrans import Translator
 from dotenv import load_dotenv
 
 load_dotenv()
 
-genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+from modules.llm_cache import cached_model
+from modules.streaming import latency_caption, map_sentences, timed
+from modules.tracing import traced, traced_stream
+from modules.translation import LANGUAGES, translate
 
 generation_config = {
     "temperature": 1,
@@ -16,45 +16,51 @@ generation_config = {
     "response_mime_type": "text/plain",
 }
 
-model = genai.GenerativeModel(model_name="gemini-2.0-flash", generation_config=generation_config)
+model = cached_model("gemini-2.0-flash", generation_config)
 
-def get_medical_advice_ai(symptoms):
-    prompt = (
+def medical_prompt(symptoms):
+    return (
         f"You are a helpful and empathetic healthcare assistant. "
         f"The user has reported the following symptoms: {symptoms}\n\n"
         "Provide short-medium, empathetic, and medically cautious advice. "
         "Include a disclaimer that the advice is not a substitute for professional medical consultation."
     )
-    response = model.start_chat(history=[]).send_message(prompt)
-    return response.text
+
+@traced("get_medical_advice_ai")
+def get_medical_advice_ai(symptoms):
+    return model.generate(medical_prompt(symptoms))
+
+@traced_stream("stream_medical_advice")
+def stream_medical_advice(symptoms):
+    """Yield the advice text as it is generated."""
+    return model.stream(medical_prompt(symptoms))
 
 def app():
     st.title("Multilingual AI Healthcare Chatbot")
     st.write("Enter your symptoms to receive AI-generated healthcare advice in your preferred language.")
     
-    language_options = {
-        "English": "en", "Hindi": "hi", "Spanish": "es", "French": "fr", "German": "de", "Chinese (Simplified)": "zh-cn"
-    }
+    language_options = LANGUAGES
     
     selected_language_full = st.selectbox("Select Target Language", list(language_options.keys()), index=0)
     target_language = language_options[selected_language_full]
     user_symptoms = st.text_area("Enter your symptoms:")
     
     if st.button("Get Advice") and user_symptoms:
-        advice = get_medical_advice_ai(user_symptoms)
-        if advice.strip():
-            if selected_language_full != "English":
-            
-                try:
-                    translation = Translator().translate(advice, dest=target_language).text
-                    if translation.strip():
-                        st.write(f"**Medical Advice ({selected_language_full}):**")
-                        st.write(translation)
-                except Exception:
-                    st.error("Error translating the advice.")
-            else:
-                st.write("**Raw AI Medical Advice:**")
-                st.write(advice)
-                
+        metrics = {}
+        if selected_language_full != "English":
+            # Sentences are translated in the background while the rest of the advice is generated.
+            st.write(f"**Medical Advice ({selected_language_full}):**")
+            translated = map_sentences(stream_medical_advice(user_symptoms),
+                                       lambda sentence: translate(sentence, target_language), keep_whitespace=True)
+            try:
+                advice = st.write_stream(timed(translated, metrics))
+            except Exception:
+                st.error("Error translating the advice.")
+                return
         else:
+            st.write("**Raw AI Medical Advice:**")
+            advice = st.write_stream(timed(stream_medical_advice(user_symptoms), metrics))
+        if not advice.strip():
             st.error("No advice returned. Please try again.")
+            return
+        st.caption(latency_caption(metrics))
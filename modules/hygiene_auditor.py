@@ -1,27 +1,50 @@
+import numpy as np
+import pandas as pd
 import streamlit as st
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
+from modules import audit_history
+from modules.bulk_geocoding import bulk_geocoding_app, geocode_table
+from modules.geocoding import geocode_city, normalize_query
 
-def geocode_city(city_name):
-    try:
-        geolocator = Nominatim(user_agent="camp_hygiene_app")
-        location = geolocator.geocode(city_name, timeout=10)
-        return (location.latitude, location.longitude) if location else None
-    except GeocoderTimedOut:
-        return None
+# Columns of a camp registry for bulk assessment.
+METRIC_COLUMNS = ["refugees", "water", "electricity", "food", "stay",
+                  "workers", "equipment", "washrooms", "bathrooms", "kits"]
+
+def compute_sanitation_scores(refugees, workers, equipment, washrooms, bathrooms, kits):
+    """
+    Vectorized sanitation score (0-100) for arrays of camps.
+
+    Each term is evaluated with the same operations, in the same order, as the
+    scalar formula, so results are bit-identical to `compute_sanitation_score`.
+    """
+    refugees = np.asarray(refugees, dtype=float)
+    workers, equipment = np.asarray(workers, dtype=float), np.asarray(equipment, dtype=float)
+    washrooms, bathrooms = np.asarray(washrooms, dtype=float), np.asarray(bathrooms, dtype=float)
+    kits = np.asarray(kits, dtype=float)
+    valid = refugees > 0
+    safe_refugees = np.where(valid, refugees, 1.0)
+    score = (
+        np.minimum((50 * workers) / safe_refugees, 1)
+        + np.minimum((20 * equipment) / safe_refugees, 1)
+        + np.minimum((25 * (washrooms + bathrooms)) / safe_refugees, 1)
+        + np.where(kits > 0, 1.0, 0.0)
+    ) * 25
+    return np.where(valid, score, 0.0)
+
+def compute_overall_hygiene_scores(water, electricity, food, stay, sanitation):
+    """Vectorized overall hygiene score: the mean of the five component scores."""
+    return (np.asarray(water, dtype=float) + electricity + food + stay + sanitation) / 5.0
+
+def compliance_bands(overall_scores):
+    """Vectorized compliance band for an array of overall scores."""
+    overall_scores = np.asarray(overall_scores, dtype=float)
+    return np.select([overall_scores >= 80, overall_scores >= 50],
+                     ["High compliance", "Moderate compliance"], "Low compliance")
 
 def compute_sanitation_score(refugees, workers, equipment, washrooms, bathrooms, kits):
-    if refugees <= 0:
-        return 0
-    return sum([
-        min((50 * workers) / refugees, 1),
-        min((20 * equipment) / refugees, 1),
-        min((25 * (washrooms + bathrooms)) / refugees, 1),
-        1 if kits > 0 else 0
-    ]) * 25
+    return float(compute_sanitation_scores(refugees, workers, equipment, washrooms, bathrooms, kits))
 
 def compute_overall_hygiene(water, electricity, food, stay, sanitation):
-    return (water + electricity + food + stay + sanitation) / 5.0
+    return float(compute_overall_hygiene_scores(water, electricity, food, stay, sanitation))
 
 def assess_hygiene_compliance(city, refugees, water, electricity, food, stay, workers, equipment, washrooms, bathrooms, kits):
     location = geocode_city(city)
@@ -29,17 +52,90 @@ def assess_hygiene_compliance(city, refugees, water, electricity, food, stay, wo
         return None, None, "Could not geocode the specified city."
     sanitation_score = compute_sanitation_score(refugees, workers, equipment, washrooms, bathrooms, kits)
     overall_score = compute_overall_hygiene(water, electricity, food, stay, sanitation_score)
-    compliance = "High compliance" if overall_score >= 80 else "Moderate compliance" if overall_score >= 50 else "Low compliance"
+    compliance = str(compliance_bands(overall_score))
     return location, overall_score, compliance
 
+def assess_camps(camps):
+    """
+    Assess a whole camp registry with column operations.
+    
+    Parameters:
+        camps (DataFrame): One row per camp with the METRIC_COLUMNS (plus any
+            identifying columns such as `camp` or `city`, which are kept).
+        
+    Returns:
+        DataFrame: The input with `sanitation_score`, `overall_score` and `compliance`
+        columns added, ranked from the worst overall score to the best.
+    """
+    missing = [column for column in METRIC_COLUMNS if column not in camps]
+    if missing:
+        raise ValueError(f"Missing camp metric columns: {', '.join(missing)}")
+    results = camps.copy()
+    metrics = {column: camps[column].to_numpy(dtype=float) for column in METRIC_COLUMNS}
+    results["sanitation_score"] = compute_sanitation_scores(
+        metrics["refugees"], metrics["workers"], metrics["equipment"],
+        metrics["washrooms"], metrics["bathrooms"], metrics["kits"])
+    results["overall_score"] = compute_overall_hygiene_scores(
+        metrics["water"], metrics["electricity"], metrics["food"], metrics["stay"],
+        results["sanitation_score"].to_numpy())
+    results["compliance"] = compliance_bands(results["overall_score"].to_numpy())
+    return results.sort_values("overall_score", kind="stable").reset_index(drop=True)
+
+def attach_locations(results, column="city", **kwargs):
+    """
+    Optional geocoding stage for a bulk assessment: adds `lat` / `lon` for the distinct
+    place names in `column`, through the cached bulk geocoding pipeline.
+    """
+    locations = geocode_table(results, column=column, **kwargs)
+    keys = results[column].map(normalize_query)
+    coords = locations.assign(key=locations["name"].map(normalize_query)).set_index("key")[["lat", "lon"]]
+    return results.assign(lat=keys.map(coords["lat"]), lon=keys.map(coords["lon"]))
+
+def bulk_assessment_app():
+    st.write(f"Upload a camp registry (CSV) with the columns: {', '.join(METRIC_COLUMNS)}, "
+             "plus a `camp` column identifying each camp (required for the audit history) and an optional "
+             "`city` column.")
+    uploaded = st.file_uploader("Camp registry", type=["csv"], key="bulk_assessment_upload")
+    if not uploaded:
+        return
+    geocode = st.checkbox("Geocode the `city` column", value=False, key="bulk_assessment_geocode")
+    save = st.checkbox("Save to audit history", value=True, key="bulk_assessment_save")
+    worst = st.number_input("Number of worst camps to show", min_value=1, value=50, key="bulk_assessment_worst")
+    if st.button("Assess All Camps", key="bulk_assessment_button"):
+        registry = pd.read_csv(uploaded)
+        if save and ("camp" not in registry or registry["camp"].isna().any()):
+            # Row positions or shared city names would file different camps under one history.
+            st.error("Saving to the audit history needs a `camp` column with a stable name for every camp. "
+                     "Add one, or untick \"Save to audit history\".")
+            return
+        try:
+            results = assess_camps(registry)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        if geocode and "city" in results:
+            results = attach_locations(results)
+        if save:
+            st.write(f"Saved {audit_history.record_assessments(results)} assessments to the audit history.")
+        st.write(results["compliance"].value_counts())
+        st.write(f"### {min(worst, len(results))} Worst Camps")
+        st.dataframe(results.head(worst))
+        st.download_button("Download full assessment", results.to_csv(index=False), "camp_assessment.csv",
+                           "text/csv", key="bulk_assessment_download")
+
+def audit_history_app():
+    st.write("### Worst Camps This Week")
+    st.dataframe(audit_history.worst_camps_this_week(limit=50))
+    camps = audit_history.camps()
+    if camps:
+        selected = st.selectbox("Score trend for camp", camps, key="audit_history_camp")
+        trend = audit_history.camp_trend(selected)
+        st.line_chart(trend.set_index("day")[["average_score", "lowest_score", "highest_score"]])
+
 def app():
     st.title("Refugee Camp Hygiene Compliance Auditor")
     city = st.text_input("Enter the city or camp location:", "New York")
-    loc = geocode_city(city)
-    if loc:
-        st.write(f"Geocoded Location: Latitude {loc[0]:.6f}, Longitude {loc[1]:.6f}")
-    else:
-        st.error("Could not geocode the provided city.")
+    camp = st.text_input("Camp name (for the audit history):", "") or city
     
     refugees = st.number_input("Number of Refugees", 1, value=1000)
     water, electricity, food, stay = [st.slider(label, 0, 100, default) for label, default in zip(
@@ -55,7 +151,23 @@ def app():
     if st.button("Assess Camp Hygiene Compliance"):
         location, overall_score, compliance = assess_hygiene_compliance(city, refugees, water, electricity, food, stay, workers, equipment, washrooms, bathrooms, kits)
         if location:
+            audit_history.record_assessment(
+                camp, city,
+                dict(refugees=refugees, water=water, electricity=electricity, food=food, stay=stay, workers=workers,
+                     equipment=equipment, washrooms=washrooms, bathrooms=bathrooms, kits=kits),
+                compute_sanitation_score(refugees, workers, equipment, washrooms, bathrooms, kits),
+                overall_score, compliance, location=location)
+            st.write(f"Geocoded Location: Latitude {location[0]:.6f}, Longitude {location[1]:.6f}")
             st.write(f"**Overall Hygiene Score:** {overall_score:.2f} / 100")
             st.write(compliance)
         else:
             st.error(compliance)
+    
+    with st.expander("Bulk Camp Geocoding"):
+        bulk_geocoding_app("hygiene_geocoding")
+    
+    with st.expander("Bulk Camp Assessment"):
+        bulk_assessment_app()
+    
+    with st.expander("Audit History"):
+        audit_history_app()
@@ -0,0 +1,282 @@
+# modules/llm_cache.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+
+from modules.sqlite_cache import SQLiteCache
+from modules.tracing import span
+
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", "data/llm_cache.sqlite")
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", 24 * 3600))
+# "gemini" (default) or "fake" for offline runs.
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "gemini")
+
+def normalize_prompt(prompt):
+    """
+    Unicode-normalized, case-folded prompt with whitespace collapsed and trailing
+    punctuation dropped from every word, so "Headache and  FEVER." and
+    "headache and fever" share a cache entry.
+    """
+    text = unicodedata.normalize("NFKC", str(prompt)).casefold()
+    text = re.sub(r"[.,;:!?]+(?=\s|$)", "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def cache_key(model_name, prompt, generation_config):
+    """Digest of the model name, normalized prompt and generation config."""
+    payload = json.dumps({"model": model_name, "prompt": normalize_prompt(prompt),
+                          "config": generation_config or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """
+    Offline stand-in for genai.GenerativeModel. Answers `generate_content` from a
+    {normalized prompt: text} mapping, or with a canned reply that echoes the prompt;
+    counts calls and can simulate latency. With `stream=True` the reply is yielded a
+    few words at a time, `chunk_delay` seconds apart.
+    """
+
+    def __init__(self, responses=None, latency=0.0, chunk_delay=0.0, model_name="fake"):
+        self.responses = {normalize_prompt(prompt): text for prompt, text in (responses or {}).items()}
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.model_name = model_name
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        text = self.responses.get(normalize_prompt(prompt))
+        text = text if text is not None else f"[offline response] {' '.join(prompt.split())}"
+        return self._stream(text) if stream else FakeResponse(text)
+
+    def _stream(self, text, words_per_chunk=4):
+        words = re.split(r"(?<=\s)", text)
+        for start in range(0, len(words), words_per_chunk):
+            if start and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield FakeResponse("".join(words[start:start + words_per_chunk]))
+
+class ResponseCache(SQLiteCache):
+    """
+    Response texts by cache key: an in-memory LRU in front of a SQLite table. Entries
+    older than `ttl` seconds are ignored and overwritten on the next call.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL_SECONDS, memory_size=1024):
+        super().__init__(path, (
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, cached_at REAL NOT NULL)",
+        ), memory_size)
+        self.ttl = ttl
+
+    def get(self, key):
+        """Fresh cached response for a key, or None."""
+        now = time.time()
+        with self._lock:
+            _, entry = self._recall(key)
+            if entry is None and self._db is not None:
+                entry = self._db.execute("SELECT response, cached_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if entry is not None:
+                    self._remember(key, entry)
+            if entry is None or now - entry[1] >= self.ttl:
+                return None
+            return entry[0]
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._remember(key, (response, now))
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO llm_cache (key, response, cached_at) VALUES (?, ?, ?)",
+                                 (key, response, now))
+                self._db.commit()
+
+class CachedModel:
+    """
+    Single-turn text generation through a ResponseCache.
+
+    Concurrent callers asking for the same key share one in-flight backend call;
+    errors are raised to all of them and are not cached.
+    """
+
+    def __init__(self, backend, model_name, generation_config=None, cache=None):
+        self._backend = backend
+        self.model_name = model_name
+        self.generation_config = dict(generation_config or {})
+        self._cache = cache
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        """The generation backend; created on first use (see `get_backend`) unless one was given."""
+        if self._backend is None:
+            self._backend = get_backend(self.model_name, self.generation_config)
+        return self._backend
+
+    @backend.setter
+    def backend(self, backend):
+        self._backend = backend
+
+    @property
+    def cache(self):
+        """The ResponseCache given, or else the process-wide one (see `set_response_cache`)."""
+        return self._cache or get_response_cache()
+
+    @cache.setter
+    def cache(self, cache):
+        self._cache = cache
+
+    def _claim(self, key):
+        """(cached response or None, in-flight future, whether this caller makes the backend call)."""
+        response = self.cache.get(key)
+        with self._lock:
+            future = self._inflight.get(key)
+            if response is None and future is None:
+                # The previous leader may have finished between the lookup and the lock.
+                response = self.cache.get(key)
+            if response is not None:
+                self.counters["hits"] += 1
+                return response, None, False
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.counters["misses"] += 1
+            else:
+                self.counters["coalesced"] += 1
+            return None, future, leader
+
+    def _release(self, key):
+        with self._lock:
+            del self._inflight[key]
+
+    def generate(self, prompt):
+        """Response text for a prompt."""
+        key = cache_key(self.model_name, prompt, self.generation_config)
+        response, future, leader = self._claim(key)
+        if response is not None:
+            return response
+        if not leader:
+            return future.result()
+        try:
+            with span("gemini.generate_content"):
+                response = self.backend.generate_content(prompt).text
+            self.cache.put(key, response)
+            future.set_result(response)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+        return response
+
+    def stream(self, prompt):
+        """
+        Yield the response text incrementally.
+
+        A miss streams chunks from the backend as they are generated and caches the
+        full text once the stream completes; cached and coalesced answers arrive as a
+        single chunk.
+        """
+        key = cache_key(self.model_name, prompt, self.generation_config)
+        response, future, leader = self._claim(key)
+        if response is not None:
+            yield response
+            return
+        if not leader:
+            yield future.result()
+            return
+        parts = []
+        try:
+            # Timed until the last chunk, including the time the consumer spends between chunks.
+            with span("gemini.stream_content"):
+                for chunk in self.backend.generate_content(prompt, stream=True):
+                    text = _chunk_text(chunk)
+                    if text:
+                        parts.append(text)
+                        yield text
+            response = "".join(parts)
+            self.cache.put(key, response)
+            future.set_result(response)
+        except GeneratorExit:
+            future.set_exception(RuntimeError("The response stream was closed before it finished."))
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release(key)
+
+def _chunk_text(chunk):
+    # Gemini raises ValueError for chunks without text parts (e.g. a bare finish reason).
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+def create_backend(model_name, generation_config):
+    """The generation backend selected by LLM_BACKEND."""
+    if LLM_BACKEND == "fake":
+        return FakeModel(model_name=model_name)
+    # Imported here so that pages without LLM features never load the Gemini client.
+    import google.generativeai as genai
+    genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+    return genai.GenerativeModel(model_name=model_name, generation_config=generation_config)
+
+_default_cache = None
+_backends = {}
+_backend_factory = create_backend
+_default_lock = threading.Lock()
+
+def get_backend(model_name, generation_config):
+    """Process-wide backend per model name and generation config, shared by every page."""
+    key = (model_name, json.dumps(generation_config or {}, sort_keys=True, default=str))
+    with _default_lock:
+        if key not in _backends:
+            _backends[key] = _backend_factory(model_name, generation_config)
+        return _backends[key]
+
+def set_backend_factory(factory):
+    """
+    Replace the backend factory (called with model name and generation config), e.g.
+    with one returning FakeModel instances in tests. Backends created so far are dropped;
+    CachedModels that already made a request keep theirs.
+    """
+    global _backend_factory
+    with _default_lock:
+        _backend_factory = factory
+        _backends.clear()
+
+def get_response_cache():
+    """Process-wide ResponseCache shared by every CachedModel."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+def set_response_cache(cache):
+    """Replace the process-wide ResponseCache used by every CachedModel without a cache of its own."""
+    global _default_cache
+    with _default_lock:
+        _default_cache = cache
+
+def cached_model(model_name, generation_config):
+    """
+    A CachedModel sharing the process-wide response cache and backend. Nothing is
+    configured until the first request, so importing a page needs no API key.
+    """
+    return CachedModel(None, model_name, generation_config)
@@ -0,0 +1,35 @@
+# modules/process_pool.py
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Imported once by the fork server, so its workers start with them already loaded.
+PRELOAD_MODULES = ["modules.food_scenarios", "modules.waste_to_resource"]
+
+_context = None
+_context_lock = threading.Lock()
+
+def get_context():
+    """
+    Start method for worker processes: forkserver (spawn where it is unavailable).
+
+    Forking the multi-threaded Streamlit server directly could copy a lock held by
+    another thread (e.g. the tracing metrics lock) into a worker and deadlock it; the
+    fork server is a clean single-threaded process, and workers forked from it skip
+    the imports spawn would repeat. Like spawn, each worker re-imports the main script
+    (under Streamlit, the page script), so its entry point must sit behind an
+    `if __name__ == "__main__":` guard, as app.py's does.
+    """
+    global _context
+    with _context_lock:
+        if _context is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                _context = multiprocessing.get_context("forkserver")
+                _context.set_forkserver_preload(PRELOAD_MODULES)
+            else:
+                _context = multiprocessing.get_context("spawn")
+        return _context
+
+def process_pool(max_workers=None, **kwargs):
+    """ProcessPoolExecutor using `get_context()`. Operations traced in the workers are not recorded here."""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context(), **kwargs)
@@ -0,0 +1,47 @@
+# modules/sqlite_cache.py
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+def connect(path, *schema):
+    """
+    Open a SQLite database that several threads may use (callers serialize access),
+    creating its directory and running the `schema` statements (CREATE ... IF NOT EXISTS).
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    for statement in schema:
+        db.execute(statement)
+    db.commit()
+    return db
+
+class SQLiteCache:
+    """
+    Base for the caches that keep an in-memory LRU in front of a SQLite table.
+
+    `_db` is None when no path is given (memory only). `_lock` guards both layers;
+    `_recall` and `_remember` expect the caller to hold it.
+    """
+
+    def __init__(self, path, schema, memory_size):
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = connect(path, *schema) if path else None
+
+    def _recall(self, key):
+        """(True, value) for a key in memory, marking it recently used; else (False, None)."""
+        if key not in self._memory:
+            return False, None
+        self._memory.move_to_end(key)
+        return True, self._memory[key]
+
+    def _remember(self, key, value):
+        """Keep a value in memory; returns the key evicted to make room, or None."""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            return self._memory.popitem(last=False)[0]
+        return None
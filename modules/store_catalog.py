@@ -0,0 +1,124 @@
+# modules/store_catalog.py
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules.store_index import StoreIndex
+
+# Source table (CSV or Parquet with name, lat, lon columns) and the columnar cache built from it.
+CATALOG_SOURCE = os.environ.get("STORE_CATALOG_SOURCE", "data/stores.csv")
+CATALOG_DIR = os.environ.get("STORE_CATALOG_DIR", "data/store_catalog")
+# File in CATALOG_DIR naming the version directory readers should open.
+CURRENT_FILE = "CURRENT"
+# Superseded versions are deleted once they are this old, so readers that just resolved them can finish.
+STALE_VERSION_SECONDS = 3600
+
+class StringColumn:
+    """
+    Read-only string column stored Arrow-style as one UTF-8 byte buffer plus offsets.
+
+    Both arrays may be memory-mapped, so a name is only decoded when it is accessed.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [str(s).encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+def read_store_table(path):
+    """Read a CSV or Parquet store table with `name`, `lat` and `lon` columns."""
+    if str(path).lower().endswith((".parquet", ".pq")):
+        table = pd.read_parquet(path, columns=["name", "lat", "lon"])
+    else:
+        table = pd.read_csv(path, usecols=["name", "lat", "lon"])
+    return table.dropna(subset=["lat", "lon"])
+
+def build_catalog(source=CATALOG_SOURCE, catalog_dir=CATALOG_DIR):
+    """
+    Convert the source table into the columnar catalog: lat.npy, lon.npy,
+    name_data.npy and name_offsets.npy in a new version directory of `catalog_dir`.
+    The version is published by atomically replacing the CURRENT pointer file, so
+    concurrent builders never share files and readers always open the four columns
+    of one complete build.
+
+    Returns:
+        version (str): Name of the published version directory.
+    """
+    table = read_store_table(source)
+    names = StringColumn.from_strings(table["name"])
+    columns = {
+        "lat": table["lat"].to_numpy(dtype=np.float64),
+        "lon": table["lon"].to_numpy(dtype=np.float64),
+        "name_data": names.data,
+        "name_offsets": names.offsets,
+    }
+    os.makedirs(catalog_dir, exist_ok=True)
+    version_dir = tempfile.mkdtemp(prefix="v-", dir=catalog_dir)
+    for column, values in columns.items():
+        np.save(os.path.join(version_dir, f"{column}.npy"), values)
+    version = os.path.basename(version_dir)
+    fd, tmp = tempfile.mkstemp(dir=catalog_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp, os.path.join(catalog_dir, CURRENT_FILE))
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    _remove_stale_versions(catalog_dir, keep=version)
+    return version
+
+def _remove_stale_versions(catalog_dir, keep):
+    cutoff = time.time() - STALE_VERSION_SECONDS
+    for entry in os.scandir(catalog_dir):
+        if entry.is_dir() and entry.name.startswith("v-") and entry.name != keep and entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def current_version(catalog_dir=CATALOG_DIR):
+    """Name of the published version directory, or None if there is none."""
+    try:
+        with open(os.path.join(catalog_dir, CURRENT_FILE), encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version if version and os.path.isdir(os.path.join(catalog_dir, version)) else None
+
+def _is_stale(source, catalog_dir):
+    marker = os.path.join(catalog_dir, CURRENT_FILE)
+    return current_version(catalog_dir) is None or os.path.getmtime(marker) < os.path.getmtime(source)
+
+def load_catalog(source=CATALOG_SOURCE, catalog_dir=CATALOG_DIR):
+    """
+    Open the store catalog as a StoreIndex over memory-mapped columns, (re)building
+    the columnar files first if they are missing or older than the source table.
+    """
+    version = build_catalog(source, catalog_dir) if _is_stale(source, catalog_dir) else current_version(catalog_dir)
+    column = lambda name: np.load(os.path.join(catalog_dir, version, f"{name}.npy"), mmap_mode="r")
+    names = StringColumn(column("name_data"), column("name_offsets"))
+    return StoreIndex(names, column("lat"), column("lon"))
+
+def viewport_bounds(lat, lon, zoom, width_px=800, height_px=500):
+    """
+    Approximate (lat_min, lat_max, lon_min, lon_max) shown by a web-mercator map of the
+    given pixel size centred on (lat, lon) at the given zoom level.
+    """
+    lon_span = 360.0 * width_px / (256 * 2 ** zoom)
+    lat_span = lon_span * height_px / width_px * np.cos(np.radians(lat))
+    return (max(lat - lat_span / 2, -90.0), min(lat + lat_span / 2, 90.0),
+            lon - lon_span / 2, lon + lon_span / 2)
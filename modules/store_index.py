@@ -0,0 +1,114 @@
+# modules/store_index.py
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0
+
+def haversine_distances(lat, lon, lats, lons):
+    """
+    Vectorized haversine distance in km from one point (or an array of points) to arrays of points.
+
+    Uses the same formula as `store_locator.haversine_distance`; inputs broadcast.
+    """
+    lat, lon, lats, lons = map(np.radians, (lat, lon, lats, lons))
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    return EARTH_RADIUS_KM * (2 * np.arcsin(np.sqrt(a)))
+
+def _unit_vectors(lats, lons):
+    """Points on the unit sphere; chord length between them is monotone in great-circle distance."""
+    lats, lons = np.radians(lats), np.radians(lons)
+    return np.column_stack([np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)])
+
+def _chord(km):
+    """Chord length on the unit sphere for a great-circle distance in km."""
+    return 2 * np.sin(np.minimum(np.asarray(km, dtype=float) / EARTH_RADIUS_KM, np.pi) / 2)
+
+class StoreIndex:
+    """
+    Spatial index over store locations held in contiguous NumPy arrays.
+
+    Stores are mapped to 3-D unit vectors and indexed with a KD-tree. Because chord
+    length grows monotonically with great-circle distance, the tree's nearest
+    neighbours are exactly the haversine nearest neighbours; reported distances are
+    recomputed with the haversine formula and ties are broken by store order, so the
+    results match a linear scan.
+    """
+
+    def __init__(self, names, lats, lons):
+        # names may be any indexable sequence (list, array or a memory-mapped StringColumn).
+        self.names = names
+        self.lats = np.ascontiguousarray(lats, dtype=float)
+        self.lons = np.ascontiguousarray(lons, dtype=float)
+        self.tree = cKDTree(_unit_vectors(self.lats, self.lons)) if len(self.lats) else None
+
+    @classmethod
+    def from_records(cls, stores):
+        """Build an index from a list of {"name", "lat", "lon"} dicts."""
+        return cls([s["name"] for s in stores], [s["lat"] for s in stores], [s["lon"] for s in stores])
+
+    def __len__(self):
+        return len(self.lats)
+
+    def store(self, i):
+        """The store at position i as a {"name", "lat", "lon"} dict."""
+        return {"name": self.names[i], "lat": float(self.lats[i]), "lon": float(self.lons[i])}
+
+    def within_bbox(self, lat_min, lat_max, lon_min, lon_max, limit=None):
+        """
+        Positions of the stores inside a lat/lon box (longitudes may extend past +/-180),
+        at most `limit` of them.
+        """
+        lon_span = lon_max - lon_min
+        in_lon = np.ones(len(self), dtype=bool) if lon_span >= 360 else (self.lons - lon_min) % 360 <= lon_span
+        inside = np.flatnonzero(in_lon & (self.lats >= lat_min) & (self.lats <= lat_max))
+        return inside if limit is None else inside[:limit]
+
+    def k_nearest_batch(self, points, k=1):
+        """
+        Answer many queries in one vectorized call.
+
+        Parameters:
+            points (array-like): (q, 2) array of (lat, lon) query points.
+            k (int): Number of stores per query.
+
+        Returns:
+            indices (ndarray): (q, k') store positions, nearest first (k' = min(k, len(self))).
+            distances (ndarray): (q, k') haversine distances in km.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        k = min(k, len(self))
+        if k == 0:
+            return np.zeros((len(points), 0), dtype=np.int64), np.zeros((len(points), 0))
+        vectors = _unit_vectors(points[:, 0], points[:, 1])
+        chords, indices = self.tree.query(vectors, k=k)
+        indices = np.asarray(indices, dtype=np.int64).reshape(len(points), k)
+        # The tree picks an arbitrary store among equally distant ones. Wherever more
+        # than k stores lie within the k-th distance (slightly widened for rounding),
+        # gather them all so the tie goes to the lowest store position.
+        radii = np.asarray(chords, dtype=float).reshape(len(points), k)[:, -1] * (1 + 1e-9) + 1e-12
+        tied = np.flatnonzero(self.tree.query_ball_point(vectors, radii, return_length=True) > k)
+        for row in tied:
+            candidates = np.asarray(self.tree.query_ball_point(vectors[row], radii[row]), dtype=np.int64)
+            distances = haversine_distances(points[row, 0], points[row, 1], self.lats[candidates], self.lons[candidates])
+            indices[row] = candidates[np.lexsort((candidates, distances))[:k]]
+        distances = haversine_distances(points[:, :1], points[:, 1:], self.lats[indices], self.lons[indices])
+        order = np.lexsort((indices, distances), axis=1)
+        return np.take_along_axis(indices, order, axis=1), np.take_along_axis(distances, order, axis=1)
+
+    def k_nearest(self, point, k=1):
+        """The k nearest stores to a (lat, lon) point as a list of (store, distance_km)."""
+        indices, distances = self.k_nearest_batch([point], k)
+        return [(self.store(i), float(d)) for i, d in zip(indices[0], distances[0])]
+
+    def within_radius(self, point, km):
+        """All stores within `km` of a (lat, lon) point as a list of (store, distance_km), nearest first."""
+        if self.tree is None:
+            return []
+        # Slightly widen the chord so rounding never drops a store on the boundary.
+        candidates = np.asarray(self.tree.query_ball_point(_unit_vectors([point[0]], [point[1]])[0],
+                                                           _chord(km) * (1 + 1e-9) + 1e-12), dtype=np.int64)
+        distances = haversine_distances(point[0], point[1], self.lats[candidates], self.lons[candidates])
+        keep = distances <= km
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.lexsort((candidates, distances))
+        return [(self.store(candidates[pos]), float(distances[pos])) for pos in order]
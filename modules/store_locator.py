@@ -2,9 +2,12 @@
 import streamlit as st
 import pandas as pd
 import math
+import numpy as np
 import pydeck as pdk
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
+from modules.bulk_geocoding import bulk_geocoding_app
+from modules.geocoding import geocode_city
+from modules.store_catalog import load_catalog, viewport_bounds
+from modules.store_index import haversine_distances
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     R = 6371.0
@@ -14,45 +17,59 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     return R * (2 * math.asin(math.sqrt(a)))
 
 def find_nearest_store(user_location, stores):
-    return min(((store, haversine_distance(user_location[0], user_location[1], store["lat"], store["lon"])) for store in stores), key=lambda x: x[1], default=(None, float('inf')))
+    if not stores:
+        return None, float('inf')
+    distances = haversine_distances(user_location[0], user_location[1],
+                                    np.array([store["lat"] for store in stores], dtype=float),
+                                    np.array([store["lon"] for store in stores], dtype=float))
+    nearest = int(np.argmin(distances))
+    return stores[nearest], float(distances[nearest])
 
-def geocode_city(city_name):
-    try:
-        geolocator = Nominatim(user_agent="store_locator_app")
-        location = geolocator.geocode(city_name, timeout=10)
-        return (location.latitude, location.longitude) if location else None
-    except GeocoderTimedOut:
-        return None
+@st.cache_resource
+def load_store_index():
+    # One memory-mapped catalog and KD-tree per process, shared by all sessions.
+    return load_catalog()
+
+def map_layer_data(index, user_location, top_indices, zoom, max_points=2000):
+    """
+    Rows for the map layer: the top-k stores, the user, and at most `max_points`
+    other stores inside the approximate viewport (never the whole catalog).
+    """
+    rows = [{**index.store(i), "color": [255, 0, 0] if rank == 0 else [255, 165, 0]}
+            for rank, i in enumerate(top_indices)]
+    in_view = index.within_bbox(*viewport_bounds(user_location[0], user_location[1], zoom), limit=max_points)
+    rows += [{**index.store(i), "color": [0, 0, 255]} for i in np.setdiff1d(in_view, top_indices)]
+    rows.append({"name": "Your Location", "lat": user_location[0], "lon": user_location[1], "color": [0, 255, 0]})
+    return pd.DataFrame(rows)
 
 def app():
     st.title("Nearest Store Finder by City")
     city = st.text_input("Enter your city:", "New York")
-    stores = [
-        {"name": "Store A", "lat": 40.7128, "lon": -74.0060},
-        {"name": "Store B", "lat": 34.0522, "lon": -118.2437},
-        {"name": "Store C", "lat": 41.8781, "lon": -87.6298},
-        {"name": "Store D", "lat": 29.7604, "lon": -95.3698},
-        {"name": "Store E", "lat": 33.4484, "lon": -112.0740},
-        {"name": "Delhi Store", "lat": 28.627393, "lon": 77.171695},
-        {"name": "Kanpur Store", "lat": 26.460, "lon": 80.321}
-    ]
+    num_results = st.slider("Number of nearest stores to list", 1, 10, 3)
+    index = load_store_index()
     
     if st.button("Find Nearest Store") and city:
         user_location = geocode_city(city)
         if user_location:
             st.success(f"Your location: Latitude {user_location[0]:.6f}, Longitude {user_location[1]:.6f}")
-            nearest_store, distance = find_nearest_store(user_location, stores)
-            if nearest_store:
+            top_indices, distances = index.k_nearest_batch([user_location], k=num_results)
+            results = [(index.store(i), float(d)) for i, d in zip(top_indices[0], distances[0])]
+            if results:
+                nearest_store, distance = results[0]
                 st.success(f"Nearest store is **{nearest_store['name']}** at **{distance:.2f} km**.")
+                st.dataframe(pd.DataFrame([{"Store": store["name"], "Distance (km)": round(d, 2)} for store, d in results]))
                 
-                store_data = [{"name": store["name"], "lat": store["lat"], "lon": store["lon"], "color": [255, 0, 0] if store["name"] == nearest_store["name"] else [0, 0, 255]} for store in stores]
-                store_data.append({"name": "Your Location", "lat": user_location[0], "lon": user_location[1], "color": [0, 255, 0]})
-                df_locations = pd.DataFrame(store_data)
+                zoom = 5
+                df_locations = map_layer_data(index, user_location, top_indices[0], zoom)
                 
                 layer = pdk.Layer("ScatterplotLayer", data=df_locations, get_position='[lon, lat]', get_color="color", get_radius=20000, pickable=True)
-                view_state = pdk.ViewState(latitude=user_location[0], longitude=user_location[1], zoom=5, pitch=0)
+                view_state = pdk.ViewState(latitude=user_location[0], longitude=user_location[1], zoom=zoom, pitch=0)
                 st.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip={"html": "<b>{name}</b>", "style": {"color": "white"}}))
             else:
                 st.error("No stores available to determine the nearest location.")
         else:
             st.error("Could not geocode the specified city.")
+    
+    with st.expander("Bulk Location Geocoding"):
+        st.write("The resolved table (name, lat, lon) can be used as a store catalog source.")
+        bulk_geocoding_app("store_geocoding")
@@ -0,0 +1,107 @@
+# modules/streaming.py
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# A sentence ends at ., !, ? (or their CJK forms) followed by whitespace, or at a line break.
+SENTENCE_BREAK = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+class SentenceSplitter:
+    """
+    Incrementally regroup text chunks into runs of complete sentences.
+
+    Runs are at least `min_chars` long (except the last one), so downstream calls
+    such as translation or speech synthesis stay few while still starting long
+    before the stream ends. Runs keep the whitespace that separates them, so joining
+    them gives back the original text, paragraph breaks and list layout included.
+    """
+
+    def __init__(self, min_chars=80):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, chunk):
+        """Add a chunk; returns the sentence runs it completed."""
+        self.buffer += chunk
+        runs = []
+        while True:
+            cut = next((m.end() for m in SENTENCE_BREAK.finditer(self.buffer)
+                        if m.end() >= self.min_chars and self.buffer[:m.start()].strip()), None)
+            if cut is None:
+                return runs
+            run, self.buffer = self.buffer[:cut], self.buffer[cut:]
+            runs.append(run)
+
+    def flush(self):
+        """The remaining text (possibly an unfinished sentence) as a final list of runs."""
+        run, self.buffer = self.buffer, ""
+        return [run] if run else []
+
+def iter_sentences(chunks, min_chars=80):
+    """Yield the sentence runs of a stream of text chunks."""
+    splitter = SentenceSplitter(min_chars)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.flush()
+
+def _around(fn, run):
+    """fn(run without its surrounding whitespace), with that whitespace put back."""
+    text = run.strip()
+    if not text:
+        return run
+    start = run.index(text)
+    return run[:start] + fn(text) + run[start + len(text):]
+
+def map_sentences(chunks, fn, max_workers=4, min_chars=80, keep_whitespace=False):
+    """
+    Yield fn(sentence) for each sentence run of a text stream, in order.
+
+    Each run is handed to a thread pool as soon as it completes, so `fn` works on
+    earlier sentences while later ones are still being generated; results are
+    yielded as soon as they and everything before them are ready.
+
+    `fn` always gets the run without its surrounding whitespace. With
+    `keep_whitespace` (for text-to-text functions such as translation) that
+    whitespace is put back around each result, so line breaks survive.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for run in iter_sentences(chunks, min_chars):
+            if keep_whitespace:
+                pending.append(pool.submit(_around, fn, run))
+            elif run.strip():
+                pending.append(pool.submit(fn, run.strip()))
+            while pending and pending[0].done():
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def tee_sentences(chunks, fn, pool, futures, min_chars=80):
+    """
+    Pass a text stream through unchanged while submitting fn(sentence) to `pool` for
+    each completed sentence run; the futures are appended to `futures` in order.
+    """
+    splitter = SentenceSplitter(min_chars)
+    for chunk in chunks:
+        yield chunk
+        futures.extend(pool.submit(fn, run.strip()) for run in splitter.feed(chunk) if run.strip())
+    futures.extend(pool.submit(fn, run.strip()) for run in splitter.flush() if run.strip())
+
+def timed(chunks, metrics):
+    """
+    Pass a stream through, recording in `metrics` the seconds until the first
+    chunk (`ttft`) and until the stream is exhausted (`total`).
+    """
+    start = time.perf_counter()
+    metrics.clear()
+    for chunk in chunks:
+        if "ttft" not in metrics:
+            metrics["ttft"] = time.perf_counter() - start
+        yield chunk
+    metrics.setdefault("ttft", time.perf_counter() - start)
+    metrics["total"] = time.perf_counter() - start
+
+def latency_caption(metrics):
+    """One-line summary of a `timed` stream."""
+    return f"Time to first token: {metrics['ttft'] * 1000:.0f} ms · total: {metrics['total']:.2f} s"
@@ -0,0 +1,271 @@
+# modules/tracing.py
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Where `export_if_due` writes the metrics: Prometheus text format, or JSON Lines for a
+# path ending in ".jsonl". An empty value disables the export.
+METRICS_EXPORT_PATH = os.environ.get("METRICS_EXPORT_PATH", "data/metrics.prom")
+METRICS_EXPORT_INTERVAL = float(os.environ.get("METRICS_EXPORT_INTERVAL", 15))
+METRIC_PREFIX = "refugee_ai"
+# Upper bounds in seconds of the latency buckets; a last, unbounded bucket catches the rest.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    """Latency histogram of one operation with fixed buckets, plus call and error counts."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+
+    def observe(self, seconds, error=False):
+        self.buckets[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.errors += bool(error)
+        self.total += seconds
+
+    def quantile(self, q):
+        """
+        Estimated q-quantile in seconds (None before the first call), interpolated
+        linearly within its bucket like Prometheus' histogram_quantile.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            if n and cumulative + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                if i == len(self.bounds):
+                    return lower
+                return lower + (self.bounds[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.bounds[-1]
+
+class Metrics:
+    """Histograms by operation name, shared by every thread of the process."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, operation, seconds, error=False):
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = Histogram(self.bounds)
+            histogram.observe(seconds, error)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {operation: {"count", "errors", "sum_seconds", "p50", "p95", "buckets"}},
+            where `buckets` holds the non-cumulative count per upper bound ("+Inf" last).
+        """
+        with self._lock:
+            return {
+                operation: {
+                    "count": h.count, "errors": h.errors, "sum_seconds": h.total,
+                    "p50": h.quantile(0.5), "p95": h.quantile(0.95),
+                    "buckets": dict(zip([*map(str, self.bounds), "+Inf"], h.buckets)),
+                }
+                for operation, h in sorted(self._histograms.items())
+            }
+
+    def summary(self):
+        """One row per operation for display, slowest total first (times in milliseconds)."""
+        by_total = sorted(self.snapshot().items(), key=lambda item: -item[1]["sum_seconds"])
+        return [{"operation": operation, "calls": s["count"], "errors": s["errors"],
+                 "p50_ms": round(s["p50"] * 1000, 1), "p95_ms": round(s["p95"] * 1000, 1),
+                 "total_s": round(s["sum_seconds"], 2)}
+                for operation, s in by_total]
+
+    def to_prometheus(self):
+        """The metrics in Prometheus text exposition format (cumulative since process start)."""
+        seconds, errors = f"{METRIC_PREFIX}_operation_seconds", f"{METRIC_PREFIX}_operation_errors_total"
+        lines = [f"# HELP {seconds} Latency of traced operations.", f"# TYPE {seconds} histogram"]
+        snapshot = self.snapshot()
+        for operation, s in snapshot.items():
+            label = f'operation="{_escape(operation)}"'
+            cumulative = 0
+            for bound, n in s["buckets"].items():
+                cumulative += n
+                lines.append(f'{seconds}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{seconds}_sum{{{label}}} {s['sum_seconds']:.6f}")
+            lines.append(f"{seconds}_count{{{label}}} {s['count']}")
+        lines += [f"# HELP {errors} Traced calls that raised an exception.", f"# TYPE {errors} counter"]
+        lines += [f'{errors}{{operation="{_escape(operation)}"}} {s["errors"]}' for operation, s in snapshot.items()]
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        """One JSON line per operation, stamped with the current time and process id."""
+        stamp = {"time": round(time.time(), 3), "pid": os.getpid()}
+        return "".join(json.dumps({**stamp, "operation": operation, **s}) + "\n"
+                       for operation, s in self.snapshot().items())
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+_default_metrics = None
+_default_lock = threading.Lock()
+_last_export = 0.0
+
+def get_metrics():
+    """Process-wide Metrics."""
+    global _default_metrics
+    with _default_lock:
+        if _default_metrics is None:
+            _default_metrics = Metrics()
+        return _default_metrics
+
+def set_metrics(metrics):
+    """Replace the process-wide Metrics (e.g. with an empty one in tests)."""
+    global _default_metrics
+    with _default_lock:
+        _default_metrics = metrics
+
+@contextmanager
+def span(operation):
+    """Record the wall time of the block under `operation`; an exception counts as an error."""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        get_metrics().observe(operation, time.perf_counter() - start, error)
+
+def traced(operation):
+    """Decorator recording every call of the function under `operation`."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(operation):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def traced_stream(operation):
+    """
+    Decorator for a function returning an iterator (e.g. a streamed response): records
+    the time from the call until the iterator is exhausted or closed under `operation`.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(operation):
+                yield from fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def export(path=METRICS_EXPORT_PATH):
+    """
+    Write the process-wide metrics to `path`: replaced atomically in Prometheus text
+    format (e.g. for node_exporter's textfile collector), or appended as JSON Lines
+    when the path ends in ".jsonl".
+    """
+    metrics = get_metrics()
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if path.endswith(".jsonl"):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(metrics.to_jsonl())
+        return
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(metrics.to_prometheus())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def export_if_due(path=METRICS_EXPORT_PATH, interval=METRICS_EXPORT_INTERVAL):
+    """
+    `export` at most once every `interval` seconds; app.py calls this at the end of each
+    rerun. A failed export is logged, never raised into the page.
+    """
+    global _last_export
+    if not path:
+        return
+    with _default_lock:
+        now = time.monotonic()
+        if _last_export and now - _last_export < interval:
+            return
+        _last_export = now
+    try:
+        export(path)
+    except OSError:
+        logger.exception("Could not export metrics to %s", path)
+
+def profile_call(fn, limit=40):
+    """
+    Run fn() under cProfile.
+
+    Returns:
+        report (str): The `limit` functions with the highest cumulative time, or None if
+        another profiler was already active in this process (fn then runs unprofiled).
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        fn()
+        return None
+    try:
+        fn()
+    finally:
+        profiler.disable()
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
+
+def admin_panel():
+    """
+    Sidebar panel for admins: p50 / p95 per traced operation, and a button that
+    profiles the next rerun (see app.py). Reads and sets `profile_next_rerun` and
+    `profile_report` in the session state.
+    """
+    # Imported here so the tracing hooks in the service modules do not pull in Streamlit.
+    import streamlit as st
+
+    with st.sidebar.expander("Performance"):
+        rows = get_metrics().summary()
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("No traced calls yet.")
+        reset_col, profile_col = st.columns(2)
+        if reset_col.button("Reset", key="tracing_reset"):
+            get_metrics().reset()
+            st.rerun()
+        if profile_col.button("Profile next rerun", key="tracing_profile",
+                              help="Capture a cProfile of the page script on the next interaction."):
+            st.session_state["profile_next_rerun"] = True
+        if st.session_state.get("profile_next_rerun"):
+            st.caption("The next rerun will be profiled.")
+        report = st.session_state.get("profile_report")
+        if report is not None:
+            st.download_button("Download profile", report, "profile.txt", "text/plain", key="tracing_download")
+            st.code(report[:6000], language=None)
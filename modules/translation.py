@@ -0,0 +1,157 @@
+# modules/translation.py
+import hashlib
+import os
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from googletrans import Translator
+
+from modules.streaming import SENTENCE_BREAK
+from modules.tracing import span
+
+# Languages offered throughout the app, by display name.
+LANGUAGES = {
+    "English": "en", "Hindi": "hi", "Spanish": "es", "French": "fr", "German": "de", "Chinese (Simplified)": "zh-cn"
+}
+# "google" (default) or "static" for offline runs.
+TRANSLATION_BACKEND = os.environ.get("TRANSLATION_BACKEND", "google")
+_SEGMENT_SPLIT = re.compile(f"({SENTENCE_BREAK.pattern})")
+
+class GoogleBackend:
+    """googletrans backend drawing on a fixed pool of reused Translator clients (one HTTP client each)."""
+
+    def __init__(self, pool_size=len(LANGUAGES)):
+        self._clients = queue.Queue()
+        for _ in range(pool_size):
+            self._clients.put(Translator())
+
+    def translate(self, text, dest, src="auto"):
+        client = self._clients.get()
+        try:
+            return client.translate(text, dest=dest, src=src).text
+        finally:
+            self._clients.put(client)
+
+class StaticBackend:
+    """
+    Offline stand-in backend: answers from a {(text, dest): translation} mapping, or
+    tags the text with the target language; counts calls.
+    """
+
+    def __init__(self, translations=None):
+        self.translations = dict(translations or {})
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text, dest, src="auto"):
+        with self._lock:
+            self.calls += 1
+        return "\n".join(self.translations.get((line, dest), f"[{dest}] {line}") for line in text.split("\n"))
+
+class TranslationService:
+    """
+    Translation shared by the healthcare chatbot and the cultural hub.
+
+    Text is split into sentences. Sentences already in the translation memory (an
+    LRU keyed by source text hash and language pair) are reused. The rest are packed
+    into newline-joined batches of up to `batch_chars` characters, which go to the
+    backend concurrently. Whitespace and line breaks between sentences are kept.
+    """
+
+    def __init__(self, backend, max_workers=len(LANGUAGES), batch_chars=1000, memory_size=4096):
+        self.backend = backend
+        self.batch_chars = batch_chars
+        self.memory_size = memory_size
+        self.counters = {"hits": 0, "misses": 0, "requests": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translation")
+
+    @staticmethod
+    def _key(sentence, dest, src):
+        return hashlib.sha256(sentence.encode("utf-8")).hexdigest(), dest, src
+
+    def _batches(self, sentences):
+        batch, size = [], 0
+        for sentence in sentences:
+            if batch and size + len(sentence) > self.batch_chars:
+                yield batch
+                batch, size = [], 0
+            batch.append(sentence)
+            size += len(sentence) + 1
+        if batch:
+            yield batch
+
+    def _translate_batch(self, batch, dest, src):
+        with self._lock:
+            self.counters["requests"] += 1
+        with span("googletrans.translate"):
+            lines = self.backend.translate("\n".join(batch), dest=dest, src=src).split("\n")
+        if len(lines) == len(batch):
+            return lines
+        # The backend merged or split lines; fall back to one request per sentence.
+        with self._lock:
+            self.counters["requests"] += len(batch)
+        with span("googletrans.translate"):
+            return [self.backend.translate(sentence, dest=dest, src=src) for sentence in batch]
+
+    def clear(self):
+        """Forget every remembered translation and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.counters = dict.fromkeys(self.counters, 0)
+
+    def translate(self, text, dest, src="auto"):
+        """Translate `text` into `dest`."""
+        if not text or not text.strip() or dest == src:
+            return text
+        parts = _SEGMENT_SPLIT.split(text)
+        sentences = {part for part in parts[::2] if part.strip()}
+        translated = {}
+        with self._lock:
+            for sentence in sentences:
+                key = self._key(sentence, dest, src)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    translated[sentence] = self._memory[key]
+            self.counters["hits"] += len(translated)
+            self.counters["misses"] += len(sentences) - len(translated)
+        misses = [sentence for sentence in dict.fromkeys(parts[::2])
+                  if sentence in sentences and sentence not in translated]
+        batches = list(self._batches(misses))
+        for batch, lines in zip(batches, self._pool.map(lambda b: self._translate_batch(b, dest, src), batches)):
+            translated.update(zip(batch, lines))
+            with self._lock:
+                for sentence, line in zip(batch, lines):
+                    self._memory[self._key(sentence, dest, src)] = line
+                while len(self._memory) > self.memory_size:
+                    self._memory.popitem(last=False)
+        parts[::2] = [translated.get(part, part) for part in parts[::2]]
+        return "".join(parts)
+
+def create_backend():
+    """The translation backend selected by TRANSLATION_BACKEND."""
+    return StaticBackend() if TRANSLATION_BACKEND == "static" else GoogleBackend()
+
+_default_service = None
+_default_lock = threading.Lock()
+
+def get_translator():
+    """Process-wide TranslationService."""
+    global _default_service
+    with _default_lock:
+        if _default_service is None:
+            _default_service = TranslationService(create_backend())
+        return _default_service
+
+def set_translator(service):
+    """Replace the process-wide TranslationService (e.g. with a StaticBackend-backed one in tests)."""
+    global _default_service
+    with _default_lock:
+        _default_service = service
+
+def translate(text, dest, src="auto"):
+    return get_translator().translate(text, dest, src)
@@ -0,0 +1,563 @@
+# modules/transport_solver.py
+import numpy as np
+from scipy.optimize import linprog
+from scipy.sparse import csr_array
+from pulp import LpProblem, LpMinimize, LpVariable, lpSum, LpStatus, value
+
+from modules.tracing import traced
+
+try:
+    import highspy
+except ImportError:  # Optional: TransportModel then re-solves through linprog.
+    highspy = None
+
+# scipy.optimize.linprog status codes mapped onto the PuLP status names used by the app.
+LINPROG_STATUS = {0: "Optimal", 1: "Not Solved", 2: "Infeasible", 3: "Unbounded", 4: "Undefined"}
+
+def balance(supply, demand, cost_matrix):
+    """
+    Balance a transportation problem by adding a zero-cost dummy supply row or
+    dummy demand column when total supply != total demand.
+
+    The inputs are copied into float arrays; the caller's lists are never modified.
+
+    Returns:
+        supply (ndarray), demand (ndarray), cost (ndarray): The balanced problem.
+    """
+    supply = np.array(supply, dtype=float)
+    demand = np.array(demand, dtype=float)
+    cost = np.array(cost_matrix, dtype=float).reshape(len(supply), len(demand))
+    total_supply, total_demand = supply.sum(), demand.sum()
+    if total_supply < total_demand:
+        # Dummy supply center absorbing the extra demand.
+        supply = np.append(supply, total_demand - total_supply)
+        cost = np.vstack([cost, np.zeros(len(demand))])
+    elif total_supply > total_demand:
+        # Dummy demand location absorbing the extra supply.
+        demand = np.append(demand, total_supply - total_demand)
+        cost = np.hstack([cost, np.zeros((len(supply), 1))])
+    return supply, demand, cost
+
+def northwest_corner(supply, demand):
+    """
+    Basic cells of the north-west corner rule for a balanced problem.
+
+    Each cell corresponds to one interval between consecutive breakpoints of the
+    cumulative supply and demand totals, so the whole basis is found without a loop.
+
+    Returns:
+        rows (ndarray), cols (ndarray): Indices of the (at most m + n - 1) basic cells.
+    """
+    cum_supply, cum_demand = np.cumsum(supply), np.cumsum(demand)
+    breaks = np.union1d(cum_supply, cum_demand)
+    starts = np.concatenate([[0.0], breaks[:-1]])
+    mids = ((starts + breaks) / 2)[breaks > starts]
+    rows = np.minimum(np.searchsorted(cum_supply, mids), len(supply) - 1)
+    cols = np.minimum(np.searchsorted(cum_demand, mids), len(demand) - 1)
+    return rows, cols
+
+def _lane_lp(rows, cols, costs, supply, demand, upper=None):
+    """
+    Solve the transportation LP restricted to the given lanes with HiGHS.
+
+    The equality constraint matrix is assembled in one shot as a sparse CSR array:
+    lane k contributes a 1 to supply row rows[k] and to demand row m + cols[k].
+    """
+    m, n, k = len(supply), len(demand), len(rows)
+    A_eq = csr_array(
+        (np.ones(2 * k), (np.concatenate([rows, m + cols]), np.tile(np.arange(k), 2))),
+        shape=(m + n, k),
+    )
+    bounds = (0, None) if upper is None else np.column_stack([np.zeros(k), upper])
+    # HiGHS presolve is very slow on the degenerate transportation structure, so it is disabled.
+    return linprog(costs, A_eq=A_eq, b_eq=np.concatenate([supply, demand]), bounds=bounds,
+                   method="highs-ds", options={"presolve": False})
+
+def _shortlist(cost, shortlist):
+    """Mask of the `shortlist` cheapest lanes of every row and every column."""
+    m, n = cost.shape
+    k_row, k_col = min(shortlist, n), min(shortlist, m)
+    active = np.zeros((m, n), dtype=bool)
+    active[np.arange(m)[:, None], np.argpartition(cost, k_row - 1, axis=1)[:, :k_row]] = True
+    active[np.argpartition(cost, k_col - 1, axis=0)[:k_col, :], np.arange(n)[None, :]] = True
+    return active
+
+def _column_generation(active, supply, demand, cost, shortlist, max_rounds):
+    """
+    Column generation on a dense balanced problem, starting from the lanes in `active`.
+
+    `active` is updated in place with the lanes added while pricing, so a caller that
+    keeps it can warm-start the next solve of a problem with the same shape.
+    """
+    m, n = cost.shape
+    k_row = min(shortlist, n)
+    active[northwest_corner(supply, demand)] = True
+
+    for _ in range(max_rounds):
+        rows, cols = np.nonzero(active)
+        res = _lane_lp(rows, cols, cost[rows, cols], supply, demand)
+        status = LINPROG_STATUS.get(res.status, "Undefined")
+        if status != "Optimal":
+            return None, None, status
+        duals = res.eqlin.marginals
+        reduced = cost - duals[:m, None] - duals[None, m:]
+        reduced[active] = 0.0
+        entering = reduced < -1e-9
+        if not entering.any():
+            break
+        # Add the most negative reduced-cost lanes of every row.
+        candidates = np.zeros_like(active)
+        candidates[np.arange(m)[:, None], np.argpartition(reduced, k_row - 1, axis=1)[:, :k_row]] = True
+        active |= candidates & entering
+    else:
+        rows, cols = np.nonzero(np.ones((m, n), dtype=bool))
+        res = _lane_lp(rows, cols, cost.ravel(), supply, demand)
+        status = LINPROG_STATUS.get(res.status, "Undefined")
+        if status != "Optimal":
+            return None, None, status
+
+    plan = np.zeros((m, n))
+    plan[rows, cols] = res.x
+    return plan, float(res.fun), status
+
+@traced("highs.solve")
+def solve_highs(supply, demand, cost, shortlist=8, max_rounds=50):
+    """
+    Solve a balanced transportation problem with SciPy's HiGHS using column generation.
+
+    Only a shortlist of lanes is modelled: the `shortlist` cheapest lanes of every
+    row and column plus the north-west corner cells (which guarantee feasibility).
+    After each solve the duals price every lane at once,
+    `reduced = cost - u[:, None] - v[None, :]`, and lanes with negative reduced cost are
+    added until none remain, at which point the restricted optimum is optimal for the
+    full problem.
+
+    Parameters:
+        supply (ndarray): Balanced supply amounts (length m).
+        demand (ndarray): Balanced demand amounts (length n).
+        cost (ndarray): Cost matrix of shape (m, n).
+        shortlist (int): Number of candidate lanes added per row/column and per round.
+        max_rounds (int): Pricing rounds before falling back to the full model.
+
+    Returns:
+        plan (ndarray or None), total_cost (float or None), status (str)
+    """
+    return _column_generation(_shortlist(cost, shortlist), supply, demand, cost, shortlist, max_rounds)
+
+# Status names for the HiGHS model statuses a transportation LP can end in.
+HIGHS_STATUS = {"kOptimal": "Optimal", "kInfeasible": "Infeasible", "kUnbounded": "Unbounded"}
+
+class TransportModel:
+    """
+    Reusable HiGHS model of an m x n transportation problem.
+
+    The model always carries both a dummy supply row and a dummy demand column, and
+    balancing only sets their amounts (one of them is zero). The constraint structure
+    therefore stays the same whichever side is short, and the lane set found by one
+    solve seeds the next, so re-solving after supply, demand or cost changes usually
+    needs a single restricted LP.
+
+    When `highspy` is installed the restricted LP is kept as a live HiGHS instance:
+    changed amounts and costs are applied to it in place and new lanes are appended as
+    columns, so every re-solve is warm-started from the last optimal basis. Without
+    `highspy` each restricted LP is re-solved through `scipy.optimize.linprog`.
+    """
+
+    def __init__(self, cost_matrix, shortlist=8, max_rounds=50):
+        cost = np.asarray(cost_matrix, dtype=float)
+        self.shape = cost.shape
+        self.shortlist = shortlist
+        self.max_rounds = max_rounds
+        self.cost = np.zeros((self.shape[0] + 1, self.shape[1] + 1))
+        self.cost[:-1, :-1] = cost
+        self.active = _shortlist(self.cost, shortlist)
+        self._highs = None
+        if highspy is not None:
+            self._init_highs()
+
+    def _init_highs(self):
+        rows, cols = self.cost.shape
+        self._highs = highspy.Highs()
+        self._highs.setOptionValue("output_flag", False)
+        self._highs.setOptionValue("presolve", "off")
+        self._highs.setOptionValue("solver", "simplex")
+        lp = highspy.HighsLp()
+        lp.num_col_ = 0
+        lp.num_row_ = rows + cols
+        lp.row_lower_ = np.zeros(rows + cols)
+        lp.row_upper_ = np.zeros(rows + cols)
+        lp.a_matrix_.start_ = np.zeros(1, dtype=np.int32)
+        self._highs.passModel(lp)
+        self._lane_rows = np.zeros(0, dtype=np.int64)
+        self._lane_cols = np.zeros(0, dtype=np.int64)
+        active, self.active = self.active, np.zeros_like(self.active)
+        self._add_lanes(active)
+
+    def _add_lanes(self, mask):
+        """Append the lanes in `mask` that are not modelled yet as HiGHS columns."""
+        rows, cols = np.nonzero(mask & ~self.active)
+        count = len(rows)
+        if count == 0:
+            return
+        self.active[rows, cols] = True
+        self._lane_rows = np.concatenate([self._lane_rows, rows])
+        self._lane_cols = np.concatenate([self._lane_cols, cols])
+        indices = np.empty(2 * count, dtype=np.int32)
+        indices[0::2] = rows
+        indices[1::2] = self.cost.shape[0] + cols
+        self._highs.addCols(count, self.cost[rows, cols], np.zeros(count), np.full(count, highspy.kHighsInf),
+                            2 * count, np.arange(0, 2 * count, 2, dtype=np.int32), indices, np.ones(2 * count))
+
+    def update_costs(self, cost_matrix):
+        """Replace the lane costs; the current lane set is kept as the starting point."""
+        self.cost[:-1, :-1] = np.asarray(cost_matrix, dtype=float)
+        if self._highs is not None and len(self._lane_rows):
+            self._highs.changeColsCost(len(self._lane_rows), np.arange(len(self._lane_rows), dtype=np.int32),
+                                       self.cost[self._lane_rows, self._lane_cols])
+
+    @traced("highs.solve")
+    def solve(self, supply, demand):
+        """
+        Balance and solve for the given supply and demand.
+
+        Returns:
+            plan (ndarray or None): m x n plan without the dummy row/column.
+            total_cost (float or None), status (str)
+        """
+        supply = np.asarray(supply, dtype=float)
+        demand = np.asarray(demand, dtype=float)
+        gap = demand.sum() - supply.sum()
+        supply = np.append(supply, max(gap, 0.0))
+        demand = np.append(demand, max(-gap, 0.0))
+        if self._highs is not None:
+            plan, total_cost, status = self._solve_highs(supply, demand)
+        else:
+            plan, total_cost, status = _column_generation(
+                self.active, supply, demand, self.cost, self.shortlist, self.max_rounds)
+        if status != "Optimal":
+            return None, None, status
+        return plan[:-1, :-1], total_cost, status
+
+    def _solve_highs(self, supply, demand):
+        rows, cols = self.cost.shape
+        amounts = np.concatenate([supply, demand])
+        self._highs.changeRowsBounds(len(amounts), np.arange(len(amounts), dtype=np.int32), amounts, amounts)
+        corner = np.zeros_like(self.active)
+        corner[northwest_corner(supply, demand)] = True
+        self._add_lanes(corner)
+        k_row = min(self.shortlist, cols)
+
+        for _ in range(self.max_rounds):
+            self._highs.run()
+            status = HIGHS_STATUS.get(self._highs.getModelStatus().name, "Not Solved")
+            if status != "Optimal":
+                return None, None, status
+            duals = np.asarray(self._highs.getSolution().row_dual)
+            reduced = self.cost - duals[:rows, None] - duals[None, rows:]
+            reduced[self.active] = 0.0
+            entering = reduced < -1e-9
+            if not entering.any():
+                plan = np.zeros((rows, cols))
+                plan[self._lane_rows, self._lane_cols] = self._highs.getSolution().col_value
+                return plan, self._highs.getInfo().objective_function_value, status
+            # Add the most negative reduced-cost lanes of every row.
+            candidates = np.zeros_like(entering)
+            candidates[np.arange(rows)[:, None], np.argpartition(reduced, k_row - 1, axis=1)[:, :k_row]] = True
+            self._add_lanes(candidates & entering)
+
+        return _column_generation(self.active.copy(), supply, demand, self.cost, self.shortlist, self.max_rounds)
+
+def _vogel_select(masked, row_alive, col_alive):
+    """Vogel's rule: the cheapest cell in the row/column with the largest penalty."""
+    def penalties(c):
+        if c.shape[1] == 1:
+            return c[:, 0]
+        two = np.partition(c, 1, axis=1)[:, :2]
+        with np.errstate(invalid="ignore"):  # Crossed-out lines are all inf.
+            return np.where(np.isinf(two[:, 1]), two[:, 0], two[:, 1] - two[:, 0])
+    row_pen = np.where(row_alive, penalties(masked), -np.inf)
+    col_pen = np.where(col_alive, penalties(masked.T), -np.inf)
+    if row_pen.max() >= col_pen.max():
+        i = int(np.argmax(row_pen))
+        return i, int(np.argmin(masked[i]))
+    j = int(np.argmax(col_pen))
+    return int(np.argmin(masked[:, j])), j
+
+def _least_cost_select(masked, row_alive, col_alive):
+    """Least-cost rule: the cheapest remaining cell."""
+    return np.unravel_index(int(np.argmin(masked)), masked.shape)
+
+def initial_basis(supply, demand, cost, method="vogel"):
+    """
+    Initial basic feasible solution of a balanced problem by Vogel's approximation
+    ("vogel") or the least-cost method ("least_cost").
+
+    Every step is a vectorized pass over the remaining cost matrix, and exactly one
+    row or column is crossed out per step, so the result has m + n - 1 basic cells
+    (some possibly zero) forming a spanning tree.
+
+    Returns:
+        plan (ndarray), rows (list), cols (list): Allocation and its basic cells.
+    """
+    select = {"vogel": _vogel_select, "least_cost": _least_cost_select}[method]
+    m, n = cost.shape
+    supply, demand = supply.astype(float), demand.astype(float)
+    tol = 1e-9 * max(supply.sum(), 1.0)
+    row_alive, col_alive = np.ones(m, dtype=bool), np.ones(n, dtype=bool)
+    plan = np.zeros((m, n))
+    rows, cols = [], []
+    while row_alive.any() and col_alive.any():
+        masked = np.where(row_alive[:, None] & col_alive[None, :], cost, np.inf)
+        i, j = select(masked, row_alive, col_alive)
+        amount = min(supply[i], demand[j])
+        plan[i, j] = amount
+        rows.append(i)
+        cols.append(j)
+        supply[i] -= amount
+        demand[j] -= amount
+        if supply[i] <= tol and (row_alive.sum() > 1 or demand[j] > tol):
+            row_alive[i] = False
+        else:
+            col_alive[j] = False
+    return plan, rows, cols
+
+def _potentials(rows, cols, cost):
+    """Dual potentials u, v with u[i] + v[j] = cost[i, j] on the basic cells (None if not a tree)."""
+    m, n = cost.shape
+    adjacency = [[] for _ in range(m + n)]
+    for i, j in zip(rows, cols):
+        adjacency[i].append(m + j)
+        adjacency[m + j].append(i)
+    potential = np.full(m + n, np.nan)
+    potential[0] = 0.0
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        for other in adjacency[node]:
+            if np.isnan(potential[other]):
+                i, j = (node, other - m) if node < m else (other, node - m)
+                potential[other] = cost[i, j] - potential[node]
+                stack.append(other)
+    if np.isnan(potential).any():
+        return None, None, adjacency
+    return potential[:m], potential[m:], adjacency
+
+def _tree_path(adjacency, start, goal):
+    """Nodes on the unique tree path from start to goal."""
+    parent = {start: None}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        if node == goal:
+            break
+        for other in adjacency[node]:
+            if other not in parent:
+                parent[other] = node
+                stack.append(other)
+    path = [goal]
+    while parent[path[-1]] is not None:
+        path.append(parent[path[-1]])
+    return path
+
+def modi_improve(plan, rows, cols, cost, max_passes=20):
+    """
+    Improve a basic feasible solution with up to `max_passes` MODI (u-v) pivots.
+
+    Each pass computes potentials on the basis tree, prices all cells at once, and
+    moves flow around the stepping-stone cycle of the most negative cell.
+
+    Returns:
+        plan (ndarray), u (ndarray or None), v (ndarray or None): The improved plan and
+        the potentials of its basis (None if the basis was not a spanning tree).
+    """
+    m, n = cost.shape
+    plan, rows, cols = plan.copy(), list(rows), list(cols)
+    u = v = None
+    for step in range(max_passes + 1):
+        u, v, adjacency = _potentials(rows, cols, cost)
+        if u is None:
+            return plan, None, None
+        reduced = cost - u[:, None] - v[None, :]
+        reduced[rows, cols] = 0.0
+        i, j = np.unravel_index(int(np.argmin(reduced)), reduced.shape)
+        if reduced[i, j] >= -1e-9 or step == max_passes:
+            break
+        # Cycle: entering cell (+), then alternate -, +, ... along the tree path col j -> row i.
+        path = _tree_path(adjacency, m + j, i)
+        cells = [(a, b - m) if a < m else (b, a - m) for a, b in zip(path, path[1:])]
+        minus = cells[0::2]
+        theta_index = min(range(len(minus)), key=lambda k: plan[minus[k]])
+        theta = plan[minus[theta_index]]
+        for k, cell in enumerate(cells):
+            plan[cell] += -theta if k % 2 == 0 else theta
+        plan[i, j] += theta
+        leaving = list(zip(rows, cols)).index(minus[theta_index])
+        rows[leaving], cols[leaving] = i, j
+    return plan, u, v
+
+def dual_lower_bound(supply, demand, cost, u=None, v=None):
+    """
+    Lower bound on the optimal cost of a balanced problem from dual-feasible potentials.
+
+    Any u, v with u[i] + v[j] <= cost[i, j] give the bound supply @ u + demand @ v. Row
+    and column minima always give such potentials; MODI potentials u, v (if supplied)
+    are made feasible by lowering each u[i] by its row's most negative reduced cost.
+    """
+    row_u = cost.min(axis=1)
+    bound = supply @ row_u + demand @ (cost - row_u[:, None]).min(axis=0)
+    col_v = cost.min(axis=0)
+    bound = max(bound, supply @ (cost - col_v[None, :]).min(axis=1) + demand @ col_v)
+    if u is not None:
+        reduced = cost - u[:, None] - v[None, :]
+        bound = max(bound, supply @ (u + np.minimum(reduced.min(axis=1), 0.0)) + demand @ v)
+    return float(bound)
+
+@traced("pulp.solve")
+def solve_pulp(supply, demand, cost):
+    """
+    Solve a balanced transportation problem with PuLP (CBC), one variable per cell.
+
+    Returns:
+        plan (ndarray or None), total_cost (float or None), status (str)
+    """
+    num_supply, num_demand = cost.shape
+    prob = LpProblem("Food_Distribution_Optimization", LpMinimize)
+    x = [[LpVariable(f"x_{i}_{j}", lowBound=0, cat="Continuous")
+          for j in range(num_demand)] for i in range(num_supply)]
+    prob += lpSum(cost[i][j] * x[i][j] for i in range(num_supply) for j in range(num_demand)), "Total_Transportation_Cost"
+    for i in range(num_supply):
+        prob += lpSum(x[i][j] for j in range(num_demand)) == supply[i], f"Supply_Constraint_{i}"
+    for j in range(num_demand):
+        prob += lpSum(x[i][j] for i in range(num_supply)) == demand[j], f"Demand_Constraint_{j}"
+    prob.solve()
+    status = LpStatus[prob.status]
+    if status != "Optimal":
+        return None, None, status
+    plan = np.array([[x[i][j].varValue for j in range(num_demand)] for i in range(num_supply)], dtype=float)
+    return plan, value(prob.objective), status
+
+# Registered solver backends. Each takes balanced (supply, demand, cost) arrays.
+SOLVERS = {
+    "highs": solve_highs,
+    "pulp": solve_pulp,
+}
+
+def solve(supply, demand, cost, solver="highs"):
+    """
+    Dispatch a balanced problem to a registered backend.
+
+    If the HiGHS backend stops without a definite answer (numerical trouble), the
+    problem is retried with PuLP.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver '{solver}'. Available: {', '.join(SOLVERS)}")
+    plan, total_cost, status = SOLVERS[solver](supply, demand, cost)
+    if solver != "pulp" and status in ("Not Solved", "Undefined"):
+        plan, total_cost, status = solve_pulp(supply, demand, cost)
+    return plan, total_cost, status
+
+def balance_lanes(supply, demand, rows, cols, costs, upper=None):
+    """
+    Lane-list counterpart of `balance`: the dummy supply center (or dummy demand
+    location) is connected to every location (or center) by zero-cost, uncapacitated lanes.
+
+    Returns:
+        supply, demand, rows, cols, costs, upper (ndarrays): The balanced problem.
+        The original lanes keep their positions at the front of the lane arrays.
+    """
+    supply = np.array(supply, dtype=float)
+    demand = np.array(demand, dtype=float)
+    rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+    costs = np.asarray(costs, dtype=float)
+    m, n = len(supply), len(demand)
+    total_supply, total_demand = supply.sum(), demand.sum()
+    if total_supply < total_demand:
+        supply = np.append(supply, total_demand - total_supply)
+        dummy_rows, dummy_cols = np.full(n, m), np.arange(n)
+    elif total_supply > total_demand:
+        demand = np.append(demand, total_supply - total_demand)
+        dummy_rows, dummy_cols = np.arange(m), np.full(m, n)
+    else:
+        dummy_rows = dummy_cols = np.zeros(0, dtype=np.int64)
+    rows = np.concatenate([rows, dummy_rows])
+    cols = np.concatenate([cols, dummy_cols])
+    costs = np.concatenate([costs, np.zeros(len(dummy_rows))])
+    if upper is not None:
+        upper = np.concatenate([np.asarray(upper, dtype=float), np.full(len(dummy_rows), np.inf)])
+    return supply, demand, rows, cols, costs, upper
+
+def _rank_within(groups, keys):
+    """Rank of each element among the elements of its group, ordered by key (0 = smallest)."""
+    order = np.lexsort((keys, groups))
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    return ranks
+
+def solve_lanes(supply, demand, rows, cols, costs, upper=None, shortlist=8, max_rounds=50):
+    """
+    Solve a balanced transportation problem over an explicit lane list with HiGHS.
+
+    Only the listed lanes are decision variables. Like `solve_highs`, the LP starts
+    from a shortlist of the cheapest lanes per center and location and adds lanes by
+    reduced cost. North-west corner cells that are not real lanes are added as
+    artificial lanes with a prohibitive cost so the restricted problem is always
+    feasible; if flow remains on them at the end, the full lane LP is solved to
+    obtain the exact status.
+
+    Parameters:
+        supply (ndarray), demand (ndarray): Balanced amounts per center / location.
+        rows (ndarray), cols (ndarray): Center and location index of each lane.
+        costs (ndarray): Unit cost of each lane.
+        upper (ndarray or None): Capacity of each lane (np.inf for uncapacitated).
+
+    Returns:
+        flows (ndarray or None): Shipment on each lane, aligned with the input lanes.
+        total_cost (float or None), status (str)
+    """
+    rows, cols = np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+    costs = np.asarray(costs, dtype=float)
+    upper = None if upper is None else np.asarray(upper, dtype=float)
+    num_lanes = len(rows)
+    if num_lanes == 0:
+        return None, None, "Infeasible"
+
+    nw_rows, nw_cols = northwest_corner(supply, demand)
+    penalty = 1.0 + np.abs(costs).max() * (len(supply) + len(demand))
+    all_rows = np.concatenate([rows, nw_rows])
+    all_cols = np.concatenate([cols, nw_cols])
+    all_costs = np.concatenate([costs, np.full(len(nw_rows), penalty)])
+    all_upper = None if upper is None else np.concatenate([upper, np.full(len(nw_rows), np.inf)])
+
+    active = np.zeros(len(all_rows), dtype=bool)
+    active[num_lanes:] = True
+    active[:num_lanes] |= _rank_within(rows, costs) < shortlist
+    active[:num_lanes] |= _rank_within(cols, costs) < shortlist
+
+    m = len(supply)
+    for _ in range(max_rounds):
+        idx = np.flatnonzero(active)
+        res = _lane_lp(all_rows[idx], all_cols[idx], all_costs[idx], supply, demand,
+                       None if all_upper is None else all_upper[idx])
+        status = LINPROG_STATUS.get(res.status, "Undefined")
+        if status != "Optimal":
+            break
+        duals = res.eqlin.marginals
+        reduced = costs - duals[rows] - duals[m + cols]
+        entering = np.flatnonzero((reduced < -1e-9) & ~active[:num_lanes])
+        if len(entering) == 0:
+            flows = np.zeros(len(all_rows))
+            flows[idx] = res.x
+            if flows[num_lanes:].max(initial=0.0) <= 1e-9:
+                return flows[:num_lanes], float(res.fun), status
+            break
+        # Add the most negative reduced-cost lanes of every center.
+        active[entering[_rank_within(rows[entering], reduced[entering]) < shortlist]] = True
+
+    # Artificial flow left over, numerical trouble or too many rounds: solve the full lane LP.
+    res = _lane_lp(rows, cols, costs, supply, demand, upper)
+    status = LINPROG_STATUS.get(res.status, "Undefined")
+    if status != "Optimal":
+        return None, None, status
+    return res.x, float(res.fun), status
@@ -0,0 +1,131 @@
+# modules/tts_cache.py
+import hashlib
+import os
+import tempfile
+import threading
+
+from gtts import gTTS
+
+from modules.streaming import map_sentences
+from modules.tracing import span
+
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "data/tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Texts longer than this are synthesized (and played) in sentence chunks of about this size.
+TTS_CHUNK_CHARS = 400
+
+def gtts_synthesize(text, lang, f):
+    """Write gTTS MP3 audio for `text` to the binary file object `f`."""
+    gTTS(text=text, lang=lang).write_to_fp(f)
+
+class AudioCache:
+    """
+    Content-addressed MP3 files, one per (text, language), in a directory.
+
+    Hits refresh the file's modification time; once the directory grows past
+    `max_bytes` the least recently used files are deleted. Files are written to a
+    temporary name and renamed into place, so a reader never sees a partial file.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES, synthesize=gtts_synthesize):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.synthesize_to = synthesize
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {entry.path: entry.stat().st_size for entry in os.scandir(directory)
+                       if entry.name.endswith(".mp3")}
+        self._total = sum(self._sizes.values())
+
+    def path(self, text, lang):
+        digest = hashlib.sha256(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.mp3")
+
+    def get(self, text, lang):
+        """Path of the cached audio, or None."""
+        path = self.path(text, lang)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def synthesize(self, text, lang="en"):
+        """Path of an MP3 file with `text` spoken in `lang`, synthesized on a miss."""
+        path = self.get(text, lang)
+        if path is not None:
+            with self._lock:
+                self.counters["hits"] += 1
+            return path
+        with self._lock:
+            self.counters["misses"] += 1
+        path = self.path(text, lang)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f, span("gtts.synthesize"):
+                self.synthesize_to(text, lang, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._added(path)
+        return path
+
+    def read(self, text, lang="en", attempts=3):
+        """
+        MP3 bytes of `text` spoken in `lang`. Unlike a path, the bytes stay valid when
+        the file is evicted later; a file evicted before it could be read is synthesized again.
+        """
+        for attempt in range(attempts):
+            try:
+                with open(self.synthesize(text, lang), "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                if attempt == attempts - 1:
+                    raise
+
+    def _added(self, path):
+        with self._lock:
+            self._total += os.path.getsize(path) - self._sizes.get(path, 0)
+            self._sizes[path] = os.path.getsize(path)
+            if self._total <= self.max_bytes:
+                return
+            by_age = sorted(self._sizes, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+            for old in by_age:
+                if self._total <= self.max_bytes:
+                    break
+                if old == path:
+                    continue
+                try:
+                    os.unlink(old)
+                except FileNotFoundError:
+                    pass
+                self._total -= self._sizes.pop(old)
+                self.counters["evictions"] += 1
+
+    def iter_speech(self, text, lang="en", chunk_chars=TTS_CHUNK_CHARS, max_workers=4):
+        """
+        Yield audio file paths for `text` in playback order.
+
+        Long texts are split into sentence chunks that are synthesized concurrently,
+        so the first path is yielded as soon as the first chunk is ready.
+        """
+        yield from map_sentences([text], lambda chunk: self.synthesize(chunk, lang), max_workers, chunk_chars)
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_audio_cache():
+    """Process-wide AudioCache."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = AudioCache()
+        return _default_cache
+
+def set_audio_cache(cache):
+    """Replace the process-wide AudioCache (e.g. with an offline synthesizer in tests)."""
+    global _default_cache
+    with _default_lock:
+        _default_cache = cache
@@ -0,0 +1,306 @@
+# modules/waste_classifier.py
+"""
+Compact CPU waste classifier.
+
+Images are reduced to a fixed FEATURE_GRID x FEATURE_GRID RGB thumbnail; a batch of
+thumbnails becomes an (N, FEATURES) matrix of color histogram, edge density and
+texture statistics in a few vectorized NumPy passes, and a linear model over the
+standardized features picks the label. Nearest-centroid models are stored in the
+same linear form, so both kinds share one `.npz` layout and one inference path.
+
+Train and benchmark from a folder with one sub-folder of images per label:
+
+    python -m modules.waste_classifier train data/waste_images --out models/waste_classifier.npz
+    python -m modules.waste_classifier benchmark data/waste_images
+"""
+import argparse
+import hashlib
+import io
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+MODEL_PATH = os.environ.get("WASTE_MODEL_PATH", "models/waste_classifier.npz")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+# Side of the square RGB thumbnail the features are computed on.
+FEATURE_GRID = 64
+COLOR_BINS = 4  # per channel, for a COLOR_BINS ** 3 joint RGB histogram
+ORIENTATION_BINS = 8
+EDGE_THRESHOLD = 32.0
+
+def rgb_thumbnail(image, size=FEATURE_GRID):
+    """
+    A PIL image as a size x size RGB array, shrunk before its colors are converted.
+
+    For a JPEG that is not loaded yet, `draft` lets the decoder downscale by up to 8x
+    in the DCT domain; a loaded image is box-reduced by `resize` first. Either way no
+    full-resolution RGB copy is made.
+    """
+    image.draft("RGB", (size, size))
+    if image.mode in ("LA", "RGBA"):
+        # Resizing these premultiplies alpha in a full-size copy; the RGB conversion
+        # drops alpha anyway, so shrink the color bands one at a time instead.
+        bands = [_shrink(image.getchannel(band), size) for band in image.getbands()[:-1]]
+        return np.asarray(Image.merge(image.mode[:-1], bands).convert("RGB"))
+    return np.asarray(_shrink(image, size).convert("RGB"))
+
+def _shrink(image, size):
+    return image.resize((size, size), Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+def load_rgb(source, size=FEATURE_GRID):
+    """Decode an image (path, bytes or file object) straight to a size x size RGB array (see `rgb_thumbnail`)."""
+    return rgb_thumbnail(Image.open(io.BytesIO(source) if isinstance(source, bytes) else source), size)
+
+def extract_features(images):
+    """
+    Feature matrix of a batch of RGB thumbnails.
+
+    Parameters:
+        images (ndarray): uint8 array of shape (N, H, W, 3).
+
+    Returns:
+        features (ndarray): float array of shape (N, FEATURES) with the normalized joint
+        RGB histogram, per-channel mean and spread, edge density, gradient and Laplacian
+        energy, gray-level spread and a magnitude-weighted gradient orientation histogram.
+    """
+    images = np.asarray(images)
+    n = len(images)
+    pixels = images.reshape(n, -1, 3)
+    count = pixels.shape[1]
+
+    quantized = (pixels.astype(np.int64) * COLOR_BINS) >> 8
+    bins = (quantized[..., 0] * COLOR_BINS + quantized[..., 1]) * COLOR_BINS + quantized[..., 2]
+    bins += np.arange(n)[:, None] * COLOR_BINS ** 3
+    histogram = np.bincount(bins.ravel(), minlength=n * COLOR_BINS ** 3).reshape(n, -1) / count
+
+    channels = pixels.astype(np.float32) / 255.0
+    color_mean = channels.mean(axis=1)
+    color_std = channels.std(axis=1)
+
+    gray = images.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    gx = gray[:, 1:-1, 2:] - gray[:, 1:-1, :-2]
+    gy = gray[:, 2:, 1:-1] - gray[:, :-2, 1:-1]
+    magnitude = np.hypot(gx, gy)
+    laplacian = (gray[:, 1:-1, 2:] + gray[:, 1:-1, :-2] + gray[:, 2:, 1:-1] + gray[:, :-2, 1:-1]
+                 - 4 * gray[:, 1:-1, 1:-1])
+    edge_density = (magnitude > EDGE_THRESHOLD).mean(axis=(1, 2))
+    texture = np.stack([
+        edge_density,
+        magnitude.mean(axis=(1, 2)) / 255.0,
+        np.abs(laplacian).mean(axis=(1, 2)) / 255.0,
+        gray.std(axis=(1, 2)) / 255.0,
+    ], axis=1)
+
+    orientation = ((np.arctan2(gy, gx) % np.pi) / np.pi * ORIENTATION_BINS).astype(np.int64)
+    orientation = np.minimum(orientation, ORIENTATION_BINS - 1).reshape(n, -1)
+    orientation += np.arange(n)[:, None] * ORIENTATION_BINS
+    weights = magnitude.reshape(n, -1)
+    orientations = np.bincount(orientation.ravel(), weights=weights.ravel(),
+                               minlength=n * ORIENTATION_BINS).reshape(n, -1)
+    orientations /= np.maximum(weights.sum(axis=1, keepdims=True), 1e-9)
+
+    return np.hstack([histogram, color_mean, color_std, texture, orientations]).astype(np.float32)
+
+class WasteClassifier:
+    """
+    Linear model over standardized features: scores = ((x - mean) / scale) @ weights + bias.
+
+    A nearest-centroid model is the special case weights = centroids.T,
+    bias = -|centroid|^2 / 2.
+    """
+
+    def __init__(self, labels, mean, scale, weights, bias, method="linear"):
+        self.labels = np.asarray(labels)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.method = method
+
+    @property
+    def version(self):
+        """Short digest of the parameters; changes whenever the model is retrained."""
+        digest = hashlib.sha256()
+        for array in (self.labels.astype(str), self.mean, self.scale, self.weights, self.bias):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return f"{self.method}-{digest.hexdigest()[:12]}"
+
+    def scores(self, features):
+        return ((features - self.mean) / self.scale) @ self.weights + self.bias
+
+    def predict_proba(self, images):
+        """Class probabilities (softmax of the scores) for a batch of RGB thumbnails."""
+        scores = self.scores(extract_features(images))
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict(self, images):
+        """Labels and confidences for a batch of RGB thumbnails."""
+        probabilities = self.predict_proba(images)
+        best = probabilities.argmax(axis=1)
+        return self.labels[best].tolist(), probabilities[np.arange(len(best)), best].tolist()
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, labels=self.labels.astype(str), mean=self.mean, scale=self.scale,
+                     weights=self.weights, bias=self.bias, method=np.array(self.method))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["labels"], data["mean"], data["scale"], data["weights"], data["bias"],
+                       method=str(data["method"]))
+
+def fit(features, labels, method="linear", epochs=500, learning_rate=0.5, l2=1e-3):
+    """
+    Fit a WasteClassifier to a feature matrix.
+
+    Parameters:
+        features (ndarray): (N, FEATURES) matrix from `extract_features`.
+        labels (sequence of str): One label per row.
+        method (str): "centroid" (nearest centroid) or "linear" (softmax regression
+            trained by full-batch gradient descent, starting from the centroid model).
+        epochs, learning_rate, l2: Gradient descent settings for "linear".
+
+    Returns:
+        WasteClassifier
+    """
+    classes, y = np.unique(np.asarray(labels), return_inverse=True)
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale < 1e-6] = 1.0
+    x = (features - mean) / scale
+
+    centroids = np.stack([x[y == k].mean(axis=0) for k in range(len(classes))])
+    weights = centroids.T.copy()
+    bias = -0.5 * (centroids ** 2).sum(axis=1)
+    if method == "linear":
+        # The centroid scores are on a squared-distance scale; shrink them to a sane softmax start.
+        weights /= x.shape[1]
+        bias /= x.shape[1]
+        targets = np.eye(len(classes))[y]
+        for _ in range(epochs):
+            scores = x @ weights + bias
+            scores -= scores.max(axis=1, keepdims=True)
+            probabilities = np.exp(scores)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            error = (probabilities - targets) / len(x)
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+    elif method != "centroid":
+        raise ValueError(f"Unknown method {method!r}; expected 'centroid' or 'linear'.")
+    return WasteClassifier(classes, mean, scale, weights, bias, method=method)
+
+def iter_labelled_images(folder):
+    """Yield (path, label) for every image under folder/<label>/."""
+    for label in sorted(os.listdir(folder)):
+        directory = os.path.join(folder, label)
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name), label
+
+def load_dataset(folder):
+    """Thumbnails and labels of a labelled folder; unreadable images are skipped."""
+    images, labels = [], []
+    for path, label in iter_labelled_images(folder):
+        try:
+            images.append(load_rgb(path))
+        except (OSError, ValueError):
+            continue
+        labels.append(label)
+    if not images:
+        raise ValueError(f"No labelled images found under {folder!r}.")
+    return np.stack(images), np.array(labels)
+
+def split(labels, holdout=0.2, seed=0):
+    """Stratified train / holdout index split."""
+    rng = np.random.default_rng(seed)
+    train, test = [], []
+    for label in np.unique(labels):
+        members = rng.permutation(np.flatnonzero(labels == label))
+        cut = int(round(len(members) * holdout)) if len(members) > 1 else 0
+        test.extend(members[:cut])
+        train.extend(members[cut:])
+    return np.array(train, dtype=int), np.array(test, dtype=int)
+
+def benchmark(model, images, labels, batch_size=32):
+    """
+    Per-image inference latency (features plus prediction, batched) and accuracy.
+
+    Returns:
+        dict: `images`, `accuracy`, `per_image_ms` and `batch_size`.
+    """
+    predicted = []
+    start = time.perf_counter()
+    for offset in range(0, len(images), batch_size):
+        predicted.extend(model.predict(images[offset:offset + batch_size])[0])
+    elapsed = time.perf_counter() - start
+    return {
+        "images": len(images),
+        "accuracy": float(np.mean(np.array(predicted) == labels)) if len(images) else float("nan"),
+        "per_image_ms": 1000 * elapsed / max(len(images), 1),
+        "batch_size": batch_size,
+    }
+
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(path=MODEL_PATH):
+    """The classifier stored at `path` (reloaded when the file changes), or None if there is none."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _models_lock:
+        cached = _models.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _models[path] = (mtime, WasteClassifier.load(path))
+        return cached[1]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.waste_classifier", description=__doc__.strip().split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_cmd = commands.add_parser("train", help="Fit a model on a labelled folder and save it.")
+    train_cmd.add_argument("folder")
+    train_cmd.add_argument("--out", default=MODEL_PATH)
+    train_cmd.add_argument("--method", choices=["centroid", "linear"], default="linear")
+    train_cmd.add_argument("--holdout", type=float, default=0.2,
+                           help="Fraction of each label kept out to report accuracy (0 to train on all).")
+    train_cmd.add_argument("--seed", type=int, default=0)
+    bench_cmd = commands.add_parser("benchmark", help="Report per-image latency and accuracy of a saved model.")
+    bench_cmd.add_argument("folder")
+    bench_cmd.add_argument("--model", default=MODEL_PATH)
+    bench_cmd.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    images, labels = load_dataset(args.folder)
+    decode_ms = 1000 * (time.perf_counter() - start) / len(images)
+    if args.command == "train":
+        train, test = split(labels, args.holdout, args.seed) if args.holdout else (np.arange(len(labels)), [])
+        model = fit(extract_features(images[train]), labels[train], method=args.method)
+        if len(test):
+            result = benchmark(model, images[test], labels[test])
+            print(f"Holdout accuracy: {result['accuracy']:.1%} on {result['images']} images")
+            # The holdout only measures the model; ship one fitted on everything.
+            model = fit(extract_features(images), labels, method=args.method)
+        model.save(args.out)
+        print(f"Saved {model.method} model with labels {', '.join(model.labels)} to {args.out}")
+    else:
+        model = WasteClassifier.load(args.model)
+        result = benchmark(model, images, labels, batch_size=args.batch_size)
+        print(f"{result['images']} images, accuracy {result['accuracy']:.1%}, "
+              f"{result['per_image_ms']:.3f} ms per image for features and prediction (batch size {result['batch_size']}), "
+              f"{decode_ms:.3f} ms per image for decoding")
+
+if __name__ == "__main__":
+    main()
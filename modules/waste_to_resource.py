@@ -1,32 +1,237 @@
+import io
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+
 import streamlit as st
-import cv2
 import numpy as np
+import pandas as pd
 from PIL import Image
 
-def classify_waste(image):
-    image_np = np.array(image)
-    image_cv = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
-    gray = cv2.cvtColor(image_cv, cv2.COLOR_BGR2GRAY)
-    mean_val = np.mean(gray)
+from modules.classification_cache import content_hash, dhash, get_classification_cache
+from modules.process_pool import process_pool
+from modules.tracing import traced
+from modules.waste_classifier import IMAGE_EXTENSIONS, get_model, load_rgb, rgb_thumbnail
+
+# Cache namespace of the grayscale-mean rule used when no trained model is installed.
+RULE_VERSION = "gray-mean-2"
+
+def _label(mean_val):
     return "organic" if mean_val < 100 else "metal" if mean_val < 150 else "plastic"
 
+def classifier_version(model):
+    return model.version if model is not None else RULE_VERSION
+
+def classify_thumbnails(thumbnails, model=None):
+    """
+    Label a batch of FEATURE_GRID x FEATURE_GRID RGB thumbnails in one call.
+
+    Uses the trained feature classifier when a model is given and the grayscale-mean
+    rule otherwise.
+
+    Returns:
+        results (list of dict): `waste_type` and `confidence` (None for the rule).
+    """
+    if not len(thumbnails):
+        return []
+    batch = np.stack(thumbnails)
+    if model is None:
+        means = (batch.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)).mean(axis=(1, 2))
+        return [{"waste_type": _label(mean_val), "confidence": None} for mean_val in means]
+    labels, confidences = model.predict(batch)
+    return [{"waste_type": label, "confidence": round(confidence, 4)} for label, confidence in zip(labels, confidences)]
+
+@traced("classify_waste")
+def classify_waste(image):
+    if not isinstance(image, Image.Image):
+        image = Image.fromarray(np.asarray(image))
+    return classify_thumbnails([rgb_thumbnail(image)], get_model())[0]["waste_type"]
+
+@traced("classify_image_bytes")
+def classify_image_bytes(data, cache=None, model=None):
+    """
+    Classify encoded image bytes through the classification cache.
+
+    An exact repeat is answered from its content hash without decoding. Otherwise the
+    image is decoded once to a small thumbnail, which yields both the perceptual hash
+    (so near-duplicates reuse an earlier result) and the features.
+
+    Parameters:
+        data (bytes): Encoded image.
+        cache (ClassificationCache): Defaults to the process-wide cache of the model.
+        model (WasteClassifier): Defaults to the installed model, if any.
+
+    Returns:
+        result (dict): `waste_type` and `confidence`.
+    """
+    model = model or get_model()
+    cache = cache or get_classification_cache(classifier_version(model))
+    key = content_hash(data)
+    result = cache.get(key)
+    if result is not None:
+        return result
+    thumbnail = load_rgb(data)
+    phash = dhash(Image.fromarray(thumbnail).convert("L"))
+    result = cache.get_similar(phash) or classify_thumbnails([thumbnail], model)[0]
+    cache.put(key, result, phash)
+    return result
+
+def _normalize_label(waste_type):
+    return str(waste_type).strip().lower().replace("_", " ").replace("-", " ")
+
+RECOMMENDATIONS = {
+    "plastic": "Consider recycling plastic waste by cleaning and segregating it.",
+    "organic": "Organic waste can be composted to produce nutrient-rich fertilizer.",
+    "metal": "Metal waste is highly recyclable and can be processed to recover valuable materials.",
+    "paper": "Keep paper dry and bundle it for recycling; soiled paper can be composted.",
+    "cardboard": "Flatten cardboard and keep it dry so it can be recycled or reused for packaging and storage.",
+    "glass": "Rinse glass and sort it by color; intact jars and bottles can be reused for storage.",
+    "textile": "Wearable textiles can be redistributed; worn-out fabric can be cut into cleaning rags or insulation.",
+    "e waste": "Take electronic waste to a certified collection point; batteries and circuit boards contain recoverable metals.",
+}
+
 def fetch_recommendations(waste_type):
-    recommendations = {
-        "plastic": "Consider recycling plastic waste by cleaning and segregating it.",
-        "organic": "Organic waste can be composted to produce nutrient-rich fertilizer.",
-        "metal": "Metal waste is highly recyclable and can be processed to recover valuable materials."
-    }
-    return recommendations.get(waste_type, "No recommendations available for this type of waste.")
+    return RECOMMENDATIONS.get(_normalize_label(waste_type), "No recommendations available for this type of waste.")
+
+def iter_image_sources(source):
+    """
+    Yield (name, source) pairs for the images in a zip archive (path, bytes or file
+    object) or a folder path. Zip members are read as bytes; folder images are yielded
+    as paths and only read when consumed.
+    """
+    if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.relpath(os.path.join(root, name), source), os.path.join(root, name)
+        return
+    with zipfile.ZipFile(io.BytesIO(source) if isinstance(source, bytes) else source) as archive:
+        for member in archive.infolist():
+            if not member.is_dir() and member.filename.lower().endswith(IMAGE_EXTENSIONS):
+                yield member.filename, archive.read(member)
+
+def _read_bytes(source):
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    return source.read()
+
+def classify_batch(items, max_workers=None, cache=None, model=None, batch_size=32):
+    """
+    Classify many images across a process pool (see `process_pool`), yielding results
+    as they finish.
+
+    Exact repeats are answered from the classification cache without decoding. Other
+    images are decoded to a thumbnail (cheap with JPEG draft mode), whose perceptual
+    hash lets near-duplicates reuse a cached result. Only the remaining thumbnails go
+    to the workers, in chunks of `batch_size`, each labelled with one batched model
+    call; the results are written back to the cache. At most a few chunks per worker
+    are in flight at any time, so memory stays bounded however many items the
+    iterable produces.
+
+    Parameters:
+        items (iterable): (name, source) pairs; a source is a path, bytes or file object.
+        max_workers (int): Worker processes (default: number of CPUs).
+        cache (ClassificationCache): Defaults to the process-wide cache of the model.
+        model (WasteClassifier): Defaults to the installed model, if any.
+        batch_size (int): Images per worker task.
+
+    Yields:
+        result (dict): `file`, `waste_type`, `confidence` and `error` (None on success).
+    """
+    model = model or get_model()
+    cache = cache or get_classification_cache(classifier_version(model))
+    window = 4 * (max_workers or os.cpu_count() or 1)
+
+    def collect(future):
+        for (name, key, phash), result in zip(pending.pop(future), future.result()):
+            cache.put(key, result, phash)
+            yield {"file": name, **result, "error": None}
+
+    with process_pool(max_workers) as pool:
+        pending = {}
+        thumbnails, entries = [], []
+        for name, source in items:
+            data = _read_bytes(source)
+            key = content_hash(data)
+            cached = cache.get(key)
+            if cached is None:
+                try:
+                    thumbnail = load_rgb(data)
+                except (OSError, ValueError) as e:
+                    yield {"file": name, "waste_type": None, "confidence": None, "error": str(e)}
+                    continue
+                phash = dhash(Image.fromarray(thumbnail).convert("L"))
+                cached = cache.get_similar(phash)
+                if cached is not None:
+                    cache.put(key, cached, phash)
+            if cached is not None:
+                yield {"file": name, **cached, "error": None}
+                continue
+            thumbnails.append(thumbnail)
+            entries.append((name, key, phash))
+            if len(thumbnails) == batch_size:
+                pending[pool.submit(classify_thumbnails, thumbnails, model)] = entries
+                thumbnails, entries = [], []
+            if len(pending) >= window:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from collect(future)
+        if thumbnails:
+            pending[pool.submit(classify_thumbnails, thumbnails, model)] = entries
+        for future in list(pending):
+            yield from collect(future)
+
+def batch_app():
+    uploads = st.file_uploader("Choose image files or zip archives", type=["jpg", "jpeg", "png", "zip"],
+                               accept_multiple_files=True)
+    if not uploads or not st.button("Classify All", key="classify_batch_button"):
+        return
+
+    def sources():
+        for upload in uploads:
+            if upload.name.lower().endswith(".zip"):
+                yield from iter_image_sources(upload)
+            else:
+                yield upload.name, upload.getvalue()
+
+    table = st.empty()
+    rows = []
+    for result in classify_batch(sources()):
+        rows.append(result)
+        table.dataframe(pd.DataFrame(rows))
+    results = pd.DataFrame(rows)
+    if len(results):
+        st.write("### Recommendations:")
+        for waste_type, count in results["waste_type"].value_counts().items():
+            st.write(f"**{waste_type.capitalize()}** ({count} images): {fetch_recommendations(waste_type)}")
+    cache_stats_caption()
+
+def cache_stats_caption():
+    stats = get_classification_cache(classifier_version(get_model())).stats()
+    st.caption(f"Classification cache: {stats['memory_hits'] + stats['disk_hits']} exact hits, "
+               f"{stats['similar_hits']} near-duplicate hits, {stats['misses']} misses "
+               f"({stats['hit_rate']:.0%} hit rate)")
 
 def app():
     st.title("Waste-to-Resource AI Platform")
     st.write("Upload an image of your waste to get recommendations on how to convert it into useful resources.")
+    mode = st.radio("Mode", ["Single Image", "Batch"], index=0, horizontal=True)
+    if mode == "Batch":
+        batch_app()
+        return
     uploaded_file = st.file_uploader("Choose an image file", type=["jpg", "jpeg", "png"])
-    
+
     if uploaded_file:
-        image = Image.open(uploaded_file)
-        st.image(image, caption="Uploaded Image", use_container_width=True)
-        waste_type = classify_waste(image)
+        data = uploaded_file.getvalue()
+        st.image(data, caption="Uploaded Image", use_container_width=True)
+        result = classify_image_bytes(data)
+        waste_type = result["waste_type"]
         st.write(f"**Detected Waste Type:** {waste_type.capitalize()}")
+        if result["confidence"] is not None:
+            st.write(f"**Confidence:** {result['confidence']:.0%}")
         st.write("### Recommendations:")
         st.write(fetch_recommendations(waste_type))
+        cache_stats_caption()